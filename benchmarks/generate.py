@@ -0,0 +1,94 @@
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database import Database
+
+# Sentetik defter üreteci. Aynı tohum ve satır sayısı her zaman aynı veriyi üretir.
+#   python benchmarks/generate.py --rows 100000 --output /tmp/defter.db
+
+TITLE_COUNT = 40
+CASH_OWNER_COUNT = 12
+CONSTRUCTION_GROUP_COUNT = 25
+START_DATE = date(2018, 1, 1)
+DAYS = 8 * 365
+
+COMPANY_WORDS = ["Yıldız", "Akdeniz", "Işık", "Çınar", "Özgür", "Anadolu", "Ege", "Kartal",
+                 "Güneş", "Demir", "Marmara", "İzmir", "Karadeniz", "Başkent", "Ilgaz"]
+COMPANY_SUFFIXES = ["İnşaat", "Yapı", "Beton", "Nalburiye", "Elektrik", "Tesisat", "Ltd. Şti.", "A.Ş."]
+DESCRIPTION_WORDS = ["çimento", "demir", "kum", "beton", "yalıtım", "boya", "fayans", "cam",
+                     "kapı", "pencere", "işçilik", "nakliye", "kira", "avans", "hakediş",
+                     "fatura", "ödeme", "tahsilat", "daire", "blok", "kat", "temel"]
+
+# (alan, olasılık, en küçük, en büyük) — her işlemde genellikle tek bir tutar alanı doludur
+AMOUNT_FIELDS = [
+    ('expense', 0.45, 100, 250000),
+    ('payment_received', 0.25, 1000, 500000),
+    ('check_received', 0.08, 5000, 300000),
+    ('check_given', 0.08, 5000, 300000),
+    ('apartment_sale', 0.04, 500000, 5000000),
+    ('invoice_amount', 0.10, 100, 200000),
+]
+
+
+def generate_records(count, seed=1):
+    rnd = random.Random(seed)
+    titles = [f"Proje {i + 1:02d}" for i in range(TITLE_COUNT)]
+    cash_owners = [f"Kasa {i + 1:02d}" for i in range(CASH_OWNER_COUNT)]
+    groups = [f"Blok {chr(ord('A') + i % 26)}{i // 26 or ''}" for i in range(CONSTRUCTION_GROUP_COUNT)]
+    companies = [f"{a} {b}" for a in COMPANY_WORDS for b in COMPANY_SUFFIXES]
+    weights = [probability for _, probability, _, _ in AMOUNT_FIELDS]
+
+    for _ in range(count):
+        record = {
+            'title': rnd.choice(titles),
+            'cash_owner': rnd.choice(cash_owners),
+            'construction_group': rnd.choice(groups) if rnd.random() < 0.7 else None,
+            'date': (START_DATE + timedelta(days=rnd.randrange(DAYS))).isoformat(),
+            'company_name': rnd.choice(companies),
+            'description': " ".join(rnd.sample(DESCRIPTION_WORDS, rnd.randint(1, 4))),
+        }
+        for field, _, _, _ in AMOUNT_FIELDS:
+            record[field] = 0
+        field, _, low, high = rnd.choices(AMOUNT_FIELDS, weights)[0]
+        record[field] = round(rnd.uniform(low, high), 2)
+
+        if rnd.random() < 0.3:
+            record['quantity'] = rnd.randint(1, 500)
+            record['unit_price'] = round(rnd.uniform(1, 2000), 2)
+        else:
+            record['quantity'] = 0
+            record['unit_price'] = 0
+        yield record
+
+
+def generate_database(path, count, seed=1):
+    # Var olan dosya silinir ve `count` işlemle yeniden oluşturulur
+    path = Path(path)
+    for suffix in ("", "-wal", "-shm"):
+        Path(str(path) + suffix).unlink(missing_ok=True)
+
+    database = Database(path)
+    database.add_transactions_bulk(generate_records(count, seed))
+    return database
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentetik muhasebe veritabanı üretir.")
+    parser.add_argument("--rows", type=int, default=100000, help="İşlem sayısı")
+    parser.add_argument("--seed", type=int, default=1, help="Rastgele üreteç tohumu")
+    parser.add_argument("--output", required=True, help="Oluşturulacak veritabanı dosyası")
+    args = parser.parse_args(argv)
+
+    database = generate_database(args.output, args.rows, args.seed)
+    print(f"{args.output}: {database.count_transactions()} işlem")
+    database.connections.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from generate import generate_database, generate_records
+
+# Performans ölçümleri. Her ölçüm ayrı bir süreçte çalışır; böylece tepe bellek
+# kullanımı ölçümler arasında karışmaz. 'startup' ölçümü uygulamanın (main.py)
+# açılış aşamalarını ölçer; sonuçlar diğerleri gibi --compare ile karşılaştırılır.
+#   python benchmarks/run.py --rows 100000 --output sonuc.json
+#   python benchmarks/run.py --rows 100000 --compare sonuc.json
+# Üretilen veritabanı geçici dizinde saklanır ve aynı satır sayısı/tohum için yeniden kullanılır.
+
+# Karşılaştırmada bu oranın üzerindeki yavaşlamalar gerileme sayılır
+DEFAULT_THRESHOLD = 1.2
+
+
+def timed(function, repeat=1):
+    # Birden çok tekrarda en iyi süre (salt okunur ölçümlerde gürültüyü azaltır)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def measure(name, rows, seconds):
+    return {'name': name, 'rows': rows, 'seconds': round(seconds, 4),
+            'rows_per_second': round(rows / seconds) if rows and seconds else None}
+
+
+def bench_insert(database, args):
+    # Boş bir veritabanına toplu ekleme (içe aktarma senaryosu)
+    count = min(args.rows, args.insert_rows)
+    with tempfile.TemporaryDirectory() as directory:
+        target = generate_database(Path(directory) / "insert.db", 0)
+        records = list(generate_records(count, args.seed))
+        _, seconds = timed(lambda: target.add_transactions_bulk(records))
+        target.connections.close()
+    return [measure("insert_bulk", count, seconds)]
+
+
+def bench_query(database, args):
+    results = []
+    last_month = database.read_connection().execute("SELECT substr(MAX(date), 1, 7) FROM transactions").fetchone()[0]
+    scenarios = [
+        ("all", {}),
+        ("title", {'title_id': 1}),
+        ("month", {'date_range': (f"{last_month}-01", f"{last_month}-31")}),
+        ("search", {'search': "beton"}),
+    ]
+    for label, filters in scenarios:
+        # Tablo modelinin yaptığı gibi: satır sayısı ve ilk sayfa
+        def first_page():
+            database.count_transactions(filters)
+            return database.get_transactions(filters, limit=200)
+        _, seconds = timed(first_page, args.repeat)
+        results.append(measure(f"query_first_page_{label}", 200, seconds))
+
+    rows, seconds = timed(lambda: database.get_transactions(order_by=('expense', True), limit=200), args.repeat)
+    results.append(measure("query_sorted_page", len(rows), seconds))
+
+    # Sonucun ortasındaki bir sayfa: OFFSET ile ve önceki satırın anahtarıyla (keyset)
+    middle = database.count_transactions() // 2
+    rows, seconds = timed(lambda: database.get_transactions(limit=200, offset=middle), args.repeat)
+    results.append(measure("query_deep_page_offset", len(rows), seconds))
+    key = database.page_key(database.get_transactions(limit=1, offset=middle - 1)[0])
+    rows, seconds = timed(lambda: database.get_transactions_page(after=key, limit=200), args.repeat)
+    results.append(measure("query_deep_page_keyset", len(rows), seconds))
+
+    rows, seconds = timed(lambda: database.get_transactions(), args.repeat)
+    results.append(measure("query_all", len(rows), seconds))
+    return results
+
+
+def bench_totals(database, args):
+    results = []
+    for group_by in ('title', 'cash_owner', 'construction_group', 'month'):
+        rows, seconds = timed(lambda: database.get_totals(group_by), args.repeat)
+        results.append(measure(f"totals_sql_{group_by}", args.rows, seconds))
+
+    snapshot, seconds = timed(lambda: database.load_columns(), args.repeat)
+    results.append(measure("columns_load", len(snapshot), seconds))
+    _, seconds = timed(lambda: [snapshot.group_sum(key) for key in ('title', 'cash_owner', 'month')], args.repeat)
+    results.append(measure("columns_group_sum", len(snapshot), seconds))
+    return results
+
+
+def bench_table(database, args):
+    # Ana pencere tablosu, Qt'nin ekransız platformunda
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow(database)
+    window.show()
+
+    def wait():
+        app.processEvents()
+        while window.query_runner.active is not None:
+            app.processEvents()
+            time.sleep(0.001)
+        app.processEvents()
+
+    wait()
+    results = []
+    _, seconds = timed(lambda: (window.refresh_table(), wait()))
+    results.append(measure("table_refresh", window.model.rowCount(), seconds))
+
+    # Kaydırarak sayfaları yükle
+    def scroll():
+        for _ in range(args.scroll_pages):
+            if not window.model.canFetchMore():
+                break
+            window.table.scrollToBottom()
+            app.processEvents()
+        return window.model.rowCount()
+    rows, seconds = timed(scroll)
+    results.append(measure("table_scroll", rows, seconds))
+
+    window.close()
+    return results
+
+
+def bench_export(database, args):
+    from report import write_excel_report
+    from export import write_csv_report
+
+    with tempfile.TemporaryDirectory() as directory:
+        rows, seconds = timed(lambda: write_excel_report(database, {}, Path(directory) / "rapor.xlsx"))
+        results = [measure("export_excel", rows, seconds)]
+        rows, seconds = timed(lambda: write_csv_report(database, {}, Path(directory) / "rapor.csv"), args.repeat)
+        results.append(measure("export_csv", rows, seconds))
+    return results
+
+
+MAIN_PATH = Path(__file__).resolve().parent.parent / "src" / "main.py"
+
+# main.py'nin MUHASEBE_STARTUP_TIMING ile yazdığı açılış aşamaları → ölçüm adları
+STARTUP_PHASES = {
+    "modüller yüklendi": "startup_modules",
+    "veritabanı açıldı": "startup_database",
+    "pencere gösterildi": "startup_window",
+    "ilk veriler yüklendi": "startup_first_data",
+}
+STARTUP_LINE = re.compile(r"açılış: (.+) (\d+) ms")
+
+
+def bench_startup(database, args):
+    # Uygulamanın soğuk açılışı: main.py ekransız platformda ilk veriler yüklenene kadar
+    # çalışır ve kapanır. Aşama süreleri main.py'nin kendi ölçümleridir (Python'un
+    # başlaması hariç); startup_process tüm sürecin duvar saati süresidir.
+    env = dict(os.environ, MUHASEBE_STARTUP_TIMING="exit", MUHASEBE_DB=str(args.db),
+               QT_QPA_PLATFORM="offscreen")
+    best = {}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, str(MAIN_PATH)], env=env, stderr=subprocess.PIPE,
+                                 text=True, timeout=300)
+        seconds = {'startup_process': time.perf_counter() - start}
+        if process.returncode != 0:
+            raise Exception(f"main.py başarısız oldu (çıkış kodu {process.returncode}):\n{process.stderr}")
+        for match in STARTUP_LINE.finditer(process.stderr):
+            if match.group(1) in STARTUP_PHASES:
+                seconds[STARTUP_PHASES[match.group(1)]] = int(match.group(2)) / 1000
+        if len(seconds) != len(STARTUP_PHASES) + 1:
+            raise Exception(f"main.py açılış sürelerini yazmadı:\n{process.stderr}")
+        for name, value in seconds.items():
+            best[name] = min(best.get(name, value), value)
+
+    # Bellek bu sürecin değil, ölçülen uygulama süreçlerinin tepe kullanımıdır
+    memory = peak_memory_mb(children=True)
+    return [dict(measure(name, 0, best[name]), peak_memory_mb=memory)
+            for name in list(STARTUP_PHASES.values()) + ['startup_process']]
+
+
+BENCHMARKS = {
+    'startup': bench_startup,
+    'insert': bench_insert,
+    'query': bench_query,
+    'totals': bench_totals,
+    'table': bench_table,
+    'export': bench_export,
+}
+
+
+def peak_memory_mb(children=False):
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_worker(args):
+    from database import Database
+
+    database = Database(args.db)
+    results = BENCHMARKS[args.worker](database, args)
+    memory = peak_memory_mb()
+    for result in results:
+        result['benchmark'] = args.worker
+        result.setdefault('peak_memory_mb', memory)
+    print(json.dumps(results))
+    return 0
+
+
+def database_path(args):
+    path = Path(tempfile.gettempdir()) / f"muhasebe_bench_{args.rows}_{args.seed}.db"
+    if not path.exists() or args.regenerate:
+        print(f"{args.rows} işlemlik veritabanı oluşturuluyor: {path}", file=sys.stderr)
+        generate_database(path, args.rows, args.seed).connections.close()
+    return path
+
+
+def compare(results, baseline_path, threshold):
+    # Aynı adlı ölçümlerin süre oranları; eşiği aşan yavaşlamaların sayısını döner
+    baseline = {result['name']: result for result in json.loads(Path(baseline_path).read_text())['results']}
+    regressions = 0
+    for result in results:
+        previous = baseline.get(result['name'])
+        if not previous or not previous['seconds']:
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        flag = ""
+        if ratio > threshold:
+            flag = "  << YAVAŞLADI"
+            regressions += 1
+        print(f"{result['name']:<32} {previous['seconds']:>10.4f} → {result['seconds']:>10.4f} s  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Muhasebe performans ölçümleri")
+    parser.add_argument("--rows", type=int, default=100000, help="Veritabanındaki işlem sayısı (10k–2M)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Yalnızca bu ölçümler")
+    parser.add_argument("--skip", nargs="+", choices=list(BENCHMARKS), default=[], help="Atlanacak ölçümler")
+    parser.add_argument("--insert-rows", type=int, default=100000, help="Toplu ekleme ölçümündeki satır sayısı")
+    parser.add_argument("--scroll-pages", type=int, default=20, help="Tablo ölçümünde kaydırılacak sayfa sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="Salt okunur ölçümlerin tekrar sayısı")
+    parser.add_argument("--regenerate", action="store_true", help="Veritabanını yeniden üret")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki JSON sonucu")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--worker", choices=list(BENCHMARKS), help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return run_worker(args)
+
+    db = database_path(args)
+    names = [name for name in (args.only or BENCHMARKS) if name not in args.skip]
+    results = []
+    for name in names:
+        command = [sys.executable, __file__, "--worker", name, "--db", str(db),
+                   "--rows", str(args.rows), "--seed", str(args.seed),
+                   "--insert-rows", str(args.insert_rows), "--scroll-pages", str(args.scroll_pages),
+                   "--repeat", str(args.repeat)]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        for result in json.loads(output.strip().splitlines()[-1]):
+            results.append(result)
+            print(f"{result['name']:<32} {result['seconds']:>10.4f} s  {result['rows_per_second'] or '-':>10} satır/s"
+                  f"  {result['peak_memory_mb'] or '-'} MB")
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'rows': args.rows,
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
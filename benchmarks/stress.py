@@ -0,0 +1,145 @@
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from generate import generate_database, generate_records
+
+# Eşzamanlı yazar ve okuyucu süreçlerle yük testi; paylaşılan klasördeki birkaç
+# iş istasyonunun aynı veritabanını kullanmasını taklit eder:
+#   python benchmarks/stress.py --writers 3 --readers 3 --seconds 20
+#   MUHASEBE_JOURNAL_MODE=WAL python benchmarks/stress.py   tek bilgisayar (WAL) ayarıyla
+# Her yazar tekli ve toplu eklemeler, güncellemeler yapar; okuyucular tablo sayfası,
+# sayım ve toplam sorguları çalıştırır. Sonunda hiçbir sürecin hata almadığı, tüm
+# eklemelerin kaydedildiği ve özet tablosunun işlemlerle tutarlı olduğu denetlenir.
+# Sorun bulunursa çıkış kodu 1'dir.
+
+BULK_SIZE = 50
+
+
+def writer(db_path, index, seconds, results):
+    from database import Database
+
+    database = Database(db_path)
+    records = list(generate_records(10000, seed=100 + index))
+    inserted = errors = 0
+    deadline = time.monotonic() + seconds
+    step = 0
+    while time.monotonic() < deadline:
+        try:
+            if step % 3 == 0:
+                batch = records[:BULK_SIZE]
+                records = records[BULK_SIZE:] + batch
+                inserted += database.add_transactions_bulk(batch)
+            else:
+                data = dict(records[step % len(records)])
+                data['title_id'] = database.lookup('titles').by_name.get(data.pop('title'))
+                data['cash_owner_id'] = database.lookup('cash_owners').by_name.get(data.pop('cash_owner'))
+                for key in ('company_name', 'description', 'construction_group'):
+                    data.setdefault(key, '')
+                saved = database.add_transaction(data)
+                inserted += 1
+                data['expense'] = (data.get('expense') or 0) + 1
+                database.update_transaction(saved['id'], data)
+        except Exception as e:
+            errors += 1
+            results.put(('error', f"yazar {index}: {e}"))
+        step += 1
+    results.put(('writer', inserted, errors))
+
+
+def reader(db_path, index, seconds, results):
+    from database import Database
+
+    database = Database(db_path)
+    queries = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            database.get_transactions(limit=200, offset=(queries * 997) % 5000)
+            database.count_transactions({'title_id': 1 + queries % 5})
+            database.get_totals('cash_owner')
+            queries += 1
+        except Exception as e:
+            errors += 1
+            results.put(('error', f"okuyucu {index}: {e}"))
+    results.put(('reader', queries, errors))
+
+
+def check_consistency(database):
+    # Özet tablosu tetikleyicilerle güncellenir; eşzamanlı yazmalardan sonra da
+    # işlemlerin toplamlarına eşit olmalıdır
+    totals = database.conn.execute(
+        "SELECT COUNT(*), TOTAL(expense), TOTAL(payment_received) FROM transactions").fetchone()
+    summary = database.conn.execute(
+        "SELECT TOTAL(transaction_count), TOTAL(expense), TOTAL(payment_received) FROM balance_summary").fetchone()
+    return int(totals[0]) == int(summary[0]) and all(
+        abs(a - b) < 0.01 for a, b in zip(totals[1:], summary[1:]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eşzamanlı yazar/okuyucu yük testi")
+    parser.add_argument("--writers", type=int, default=3)
+    parser.add_argument("--readers", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=20000, help="Başlangıçtaki işlem sayısı")
+    parser.add_argument("--db", help="Kullanılacak veritabanı (varsayılan: geçici dizinde üretilir)")
+    args = parser.parse_args(argv)
+
+    db_path = Path(args.db) if args.db else Path(tempfile.gettempdir()) / "muhasebe_stress.db"
+    database = generate_database(db_path, args.rows)
+    start_count = database.count_transactions()
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=writer, args=(str(db_path), i, args.seconds, results))
+                 for i in range(args.writers)]
+    processes += [multiprocessing.Process(target=reader, args=(str(db_path), i, args.seconds, results))
+                  for i in range(args.readers)]
+    for process in processes:
+        process.start()
+
+    inserted = queries = 0
+    messages = []
+    finished = 0
+    while finished < len(processes):
+        result = results.get()
+        if result[0] == 'error':
+            messages.append(result[1])
+            continue
+        finished += 1
+        if result[0] == 'writer':
+            inserted += result[1]
+        else:
+            queries += result[1]
+    for process in processes:
+        process.join()
+
+    final_count = database.count_transactions()
+    consistent = check_consistency(database)
+    print(f"{args.writers} yazar, {args.readers} okuyucu, {args.seconds:g} sn "
+          f"(günlük kipi: {database.connections.journal_mode})")
+    print(f"eklenen işlem: {inserted} ({inserted / args.seconds:.0f}/sn), "
+          f"okuma turu: {queries} ({queries / args.seconds:.0f}/sn)")
+    for message in messages[:20]:
+        print(f"  hata: {message}")
+
+    failed = False
+    if messages:
+        print(f"{len(messages)} hata")
+        failed = True
+    if final_count != start_count + inserted:
+        print(f"kayıp işlem: beklenen {start_count + inserted}, bulunan {final_count}")
+        failed = True
+    if not consistent:
+        print("özet tablosu işlemlerle tutarsız")
+        failed = True
+    print("BAŞARISIZ" if failed else "tamam")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
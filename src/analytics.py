@@ -0,0 +1,87 @@
+import numpy as np
+
+NUMERIC_FIELDS = ['expense', 'payment_received', 'check_received', 'check_given',
+                  'apartment_sale', 'invoice_amount', 'quantity', 'unit_price']
+
+# Anlık görüntünün sayısal sütunları; total_amount veritabanında saklanan sütundan okunur
+SNAPSHOT_FIELDS = NUMERIC_FIELDS + ['total_amount']
+
+# Gruplama anahtarları → anlık görüntüdeki sütun
+GROUP_KEYS = {
+    'title': 'title_id',
+    'cash_owner': 'cash_owner_id',
+    'construction_group': 'construction_group_id',
+    'month': 'month'
+}
+
+
+class ColumnarSnapshot:
+    # İşlemlerin sütun bazlı kopyası: her alan ayrı bir NumPy dizisidir.
+    # Eksik başlık/kasa sahibi/inşaat grubu 0, tarih 1970-01-01'den itibaren gün
+    # sayısı, ay ise 1970-01'den itibaren ay sayısı olarak tutulur.
+    def __init__(self, ids, title_id, cash_owner_id, construction_group_id, day, numeric):
+        self.id = ids
+        self.title_id = title_id
+        self.cash_owner_id = cash_owner_id
+        self.construction_group_id = construction_group_id
+        self.day = day
+        self.month = day.astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+        for field in SNAPSHOT_FIELDS:
+            setattr(self, field, numeric[field])
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        # chunks: (n, 5 + len(SNAPSHOT_FIELDS)) boyutlu float64 dizileri
+        if chunks:
+            data = np.concatenate(chunks)
+        else:
+            data = np.empty((0, 5 + len(SNAPSHOT_FIELDS)))
+        keys = data[:, :5].astype(np.int64)
+        numeric = {field: np.ascontiguousarray(data[:, 5 + i]) for i, field in enumerate(SNAPSHOT_FIELDS)}
+        return cls(keys[:, 0], keys[:, 1].astype(np.int32), keys[:, 2].astype(np.int32),
+                   keys[:, 3].astype(np.int32), keys[:, 4].astype(np.int32), numeric)
+
+    def __len__(self):
+        return len(self.id)
+
+    def totals(self, fields=None):
+        fields = fields or SNAPSHOT_FIELDS
+        return {field: float(getattr(self, field).sum()) for field in fields}
+
+    def group_index(self, key):
+        # (grup değerleri, her satırın grup sırası). Anahtarlar küçük tamsayılar
+        # olduğundan sıralama yerine doğrudan sayma kullanılır.
+        values = getattr(self, GROUP_KEYS[key])
+        if len(values) == 0:
+            return values, values
+        low = int(values.min())
+        counts = np.bincount(values - low)
+        groups = np.flatnonzero(counts)
+        position = np.zeros(len(counts), dtype=np.intp)
+        position[groups] = np.arange(len(groups))
+        return groups + low, position[values - low]
+
+    def group_sum(self, key, fields=None):
+        # {grup değeri: {alan: toplam}}; np.bincount ile tek geçişte hesaplanır
+        fields = fields or SNAPSHOT_FIELDS
+        groups, inverse = self.group_index(key)
+        sums = {field: np.bincount(inverse, weights=getattr(self, field), minlength=len(groups))
+                for field in fields}
+        counts = np.bincount(inverse, minlength=len(groups))
+        return {
+            int(group): dict({field: float(sums[field][i]) for field in fields}, count=int(counts[i]))
+            for i, group in enumerate(groups)
+        }
+
+    def pivot(self, row_key, column_key, field):
+        # (satır grupları, sütun grupları, toplam matrisi)
+        rows, row_index = self.group_index(row_key)
+        columns, column_index = self.group_index(column_key)
+        flat = row_index * len(columns) + column_index
+        matrix = np.bincount(flat, weights=getattr(self, field), minlength=len(rows) * len(columns))
+        return rows, columns, matrix.reshape(len(rows), len(columns))
+
+
+def month_label(month):
+    # 1970-01'den itibaren ay sayısını 'YYYY-MM' biçimine çevirir
+    return str(np.datetime64(int(month), 'M'))
@@ -0,0 +1,179 @@
+import argparse
+import json
+import sys
+
+from database import Database
+
+# Ekransız sunucularda rapor, içe aktarma ve özet için komut satırı aracı:
+#   python src/cli.py report [-o dosya.xlsx] [--start YYYY-MM-DD] [--end YYYY-MM-DD] ...
+#   python src/cli.py report --split title [-o klasör] [--jobs 4]   başlık başına bir dosya
+#   python src/cli.py report --format csv [--delimiter ,] [--decimal point] [--no-bom]
+#   python src/cli.py import dosya.csv [dosya.xlsx ...] [--decimal comma|point]
+#   python src/cli.py stats [--by title|cash_owner|construction_group|month] ...
+#   python src/cli.py close-period 2024 [--vacuum]   2024'ten önceki yılları arşive taşır
+# PySide6 hiç yüklenmez; openpyxl yalnızca Excel okunup yazılırken yüklenir.
+
+STATS_COLUMNS = [("İşlem", 'transaction_count'), ("Yapılan Ödeme", 'expense'),
+                 ("Alınan Ödeme", 'payment_received'), ("Toplam Tutar", 'total_amount'),
+                 ("Bakiye", 'balance')]
+
+
+def add_filter_arguments(parser):
+    parser.add_argument("--start", help="Başlangıç tarihi (YYYY-AA-GG)")
+    parser.add_argument("--end", help="Bitiş tarihi (YYYY-AA-GG)")
+    parser.add_argument("--title", help="Başlık adı")
+    parser.add_argument("--cash-owner", help="Kasa sahibi adı")
+    parser.add_argument("--search", help="Firma veya açıklamada aranacak metin")
+
+
+def build_filters(database, args):
+    filters = {}
+    if args.start or args.end:
+        filters['date_range'] = (args.start or '0000-01-01', args.end or '9999-12-31')
+
+    for table, key, name in [('titles', 'title_id', args.title),
+                             ('cash_owners', 'cash_owner_id', args.cash_owner)]:
+        if name:
+            if name not in database.lookup(table).by_name:
+                raise Exception(f"Bulunamadı: {name}")
+            filters[key] = database.lookup(table).by_name[name]
+
+    if args.search:
+        filters['search'] = args.search
+
+    # Arayüzün verdiği filtre sözlüğü (ör. boş başlıklı işlemler için title_id=None)
+    if getattr(args, 'filters', None):
+        filters.update(json.loads(args.filters))
+    return filters
+
+
+def print_progress(done, total):
+    # Arayüzdeki rapor süreci bu satırları okur
+    print(f"ilerleme {done} {total}", flush=True)
+
+
+def run_report(database, args):
+    from report import (write_excel_report, write_split_reports, write_summary_report,
+                        new_report_path)
+    from report_cache import cached_report
+
+    filters = build_filters(database, args)
+    if args.format != 'xlsx' and (args.split or args.summary_only):
+        raise Exception("--split ve --summary-only yalnızca Excel raporlarında kullanılabilir")
+
+    def row_progress():
+        if not args.progress:
+            return None
+        total = database.count_transactions(filters)
+        return lambda count: print_progress(count, total)
+
+    if args.split:
+        output = args.output or new_report_path(".", "")
+        progress = print_progress if args.progress else None
+        count = write_split_reports(database, filters, args.split, output, args.jobs, progress)
+    elif args.summary_only:
+        output = args.output or new_report_path(".")
+        count = cached_report(database, 'summary', filters, output,
+                              lambda path: write_summary_report(database, filters, path))
+    elif args.format != 'xlsx':
+        from export import write_csv_report, TEXT_FORMATS
+
+        output = args.output or new_report_path(".", f".{args.format}")
+        delimiter = args.delimiter or TEXT_FORMATS[args.format]
+        options = {'delimiter': delimiter, 'decimal': args.decimal, 'bom': not args.no_bom}
+        count = cached_report(database, 'text', filters, output,
+                              lambda path: write_csv_report(database, filters, path, delimiter,
+                                                            args.decimal == 'comma', not args.no_bom,
+                                                            row_progress()),
+                              options)
+    else:
+        output = args.output or new_report_path(".")
+        count = cached_report(database, 'xlsx', filters, output,
+                              lambda path: write_excel_report(database, filters, path, row_progress()))
+    if not count:
+        print("Seçilen kriterlere uygun kayıt bulunamadı.", file=sys.stderr)
+        return 1
+    print(f"{output}: {count} işlem yazıldı")
+    return 0
+
+
+def run_import(database, args):
+    from importer import import_file
+
+    for file in args.files:
+        count = import_file(database, file, args.decimal)
+        print(f"{file}: {count} işlem içe aktarıldı")
+    return 0
+
+
+def run_stats(database, args):
+    filters = build_filters(database, args)
+    rows = database.get_totals(args.by, filters) if args.by else []
+    total = database.get_totals(filters=filters)[0]
+
+    print("\t".join([args.by or ""] + [header for header, _ in STATS_COLUMNS]))
+    for row in rows + [total]:
+        name = "Toplam" if row is total else (row['name'] or "(Belirtilmemiş)")
+        values = [str(row['transaction_count'])] + [f"{row[key]:.2f}" for _, key in STATS_COLUMNS[1:]]
+        print("\t".join([name] + values))
+    return 0
+
+
+def run_close_period(database, args):
+    count = database.close_period(args.year, args.vacuum)
+    print(f"{count} işlem arşive taşındı")
+    for archive in database.get_archives():
+        print(f"{archive['year']}\t{archive['transaction_count']}\t{archive['file']}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Muhasebe komut satırı aracı")
+    parser.add_argument("--db", default="database/muhasebe.db", help="Veritabanı dosyası")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="Excel raporu oluşturur")
+    report.add_argument("-o", "--output", help="Çıktı dosyası (varsayılan: muhasebe_raporu_<zaman>.xlsx)")
+    report.add_argument("--format", choices=["xlsx", "csv", "tsv"], default="xlsx",
+                        help="Excel veya düz metin (CSV/TSV) çıktı")
+    report.add_argument("--delimiter", help="CSV/TSV alan ayracı (varsayılan: CSV için ';', TSV için sekme)")
+    report.add_argument("--decimal", choices=["comma", "point"], default="comma",
+                        help="CSV/TSV ondalık ayracı (varsayılan: virgül)")
+    report.add_argument("--no-bom", action="store_true", help="CSV/TSV dosyasının başına UTF-8 BOM yazma")
+    report.add_argument("--split", choices=["title", "cash_owner"],
+                        help="Başlık veya kasa sahibi başına ayrı dosya; -o klasör adıdır")
+    report.add_argument("--jobs", type=int, help="--split ile paralel süreç sayısı (varsayılan: işlemci sayısı)")
+    report.add_argument("--summary-only", action="store_true", help="Yalnızca özet sayfaları")
+    report.add_argument("--progress", action="store_true", help="İlerlemeyi 'ilerleme <biten> <toplam>' satırlarıyla yazar")
+    report.add_argument("--filters", help=argparse.SUPPRESS)
+    add_filter_arguments(report)
+    report.set_defaults(run=run_report)
+
+    importer = commands.add_parser("import", help="CSV/XLSX dosyalarından işlem içe aktarır")
+    importer.add_argument("files", nargs="+", help="İçe aktarılacak .csv veya .xlsx dosyaları")
+    importer.add_argument("--decimal", choices=["comma", "point"],
+                          help="Ondalık ayracı (varsayılan: otomatik; virgülsüz 1.500 binlik sayılır)")
+    importer.set_defaults(run=run_import)
+
+    stats = commands.add_parser("stats", help="Filtreye uyan işlemlerin toplamlarını yazdırır")
+    stats.add_argument("--by", choices=sorted(Database.TOTAL_GROUPS), help="Gruplama")
+    add_filter_arguments(stats)
+    stats.set_defaults(run=run_stats)
+
+    close_period = commands.add_parser("close-period",
+                                       help="Verilen yıldan önceki işlemleri yıllık arşiv dosyalarına taşır")
+    close_period.add_argument("year", type=int, help="Açık kalacak ilk yıl")
+    close_period.add_argument("--vacuum", action="store_true", help="Ardından veritabanı dosyasını küçült (VACUUM)")
+    close_period.set_defaults(run=run_close_period)
+
+    args = parser.parse_args(argv)
+    try:
+        database = Database(args.db)
+        return args.run(database, args)
+    except Exception as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from instrumentation import connection_factory
+
+# Kilit beklerken SQLite'ın kendi içinde bekleyeceği süre (ms)
+BUSY_TIMEOUT_MS = int(os.environ.get("MUHASEBE_BUSY_TIMEOUT_MS", "5000"))
+# busy_timeout sonrası yazma kilidi için ek deneme sayısı
+WRITE_RETRIES = 5
+# Günlük kipi. Varsayılan DELETE, veritabanının birkaç iş istasyonundan ağ paylaşımı
+# üzerinden açıldığı kurulumda da güvenlidir. WAL okuyucuların yazarı beklemesini
+# önler, ancak paylaşılan bellek kullandığından yalnızca tüm bağlantılar aynı
+# bilgisayardaysa kullanılabilir; MUHASEBE_JOURNAL_MODE=WAL ile açılır.
+JOURNAL_MODE = os.environ.get("MUHASEBE_JOURNAL_MODE", "DELETE")
+# Grup commit: WAL kipinde synchronous=NORMAL ile commit'ler fsync beklemez; WAL
+# dosyası denetim noktalarında (checkpoint) toplu olarak diske yazılır. Veritabanı
+# çökmelere karşı tutarlı kalır, ancak elektrik kesintisinde son commit'ler
+# kaybolabilir. Yoğun veri girişinde MUHASEBE_JOURNAL_MODE=WAL ile birlikte
+# MUHASEBE_GROUP_COMMIT=1 verilerek açılır.
+GROUP_COMMIT = os.environ.get("MUHASEBE_GROUP_COMMIT", "") not in ("", "0")
+# borrow_reader ile kullanılıp geri verilen, açık tutulan en fazla okuma bağlantısı
+MAX_IDLE_READERS = 4
+
+
+def is_busy_error(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class ConnectionManager:
+    # Tek bir yazma bağlantısı ve iş parçacığı başına bir salt okunur bağlantı
+    # (kısa ömürlü havuz iş parçacıkları ortak bir havuzdan ödünç alır, bkz. borrow_reader).
+    # WAL kipinde okuyucular yazarı engellemez; yazma kilidi BEGIN IMMEDIATE ile alınır ve
+    # kilit meşgulse artan bekleme süreleriyle yeniden denenir.
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.writer = self.connect()
+        self.journal_mode = self.writer.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}").fetchone()[0]
+        # NORMAL yalnızca WAL'da çökme güvenlidir
+        if GROUP_COMMIT and self.journal_mode.lower() == "wal":
+            self.writer.execute("PRAGMA synchronous = NORMAL")
+        self.local = threading.local()
+        self.readers = []
+        # borrow_reader ile geri verilmiş, yeniden kullanılmayı bekleyen bağlantılar
+        self.idle_readers = []
+        self.lock = threading.Lock()
+
+    def connect(self, read_only=False):
+        if read_only:
+            uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT_MS / 1000,
+                                   check_same_thread=False, factory=connection_factory())
+        else:
+            conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_MS / 1000,
+                                   factory=connection_factory())
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return conn
+
+    def reader(self):
+        # Çağıran iş parçacığının salt okunur bağlantısı (ilk kullanımda açılır)
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.connect(read_only=True)
+            self.local.conn = conn
+            with self.lock:
+                self.readers.append(conn)
+        return conn
+
+    @contextmanager
+    def borrow_reader(self):
+        # Kısa ömürlü iş parçacıkları (QThreadPool) için havuzdan alınan okuma bağlantısı.
+        # Blok süresince iş parçacığının bağlantısı olur (reader() bunu döner), sonra
+        # havuza geri verilir. Havuz iş parçacıkları sona erip yenileri açıldıkça
+        # bağlantı sayısı artmaz; fazla boşta kalanlar kapatılır.
+        with self.lock:
+            conn = self.idle_readers.pop() if self.idle_readers else None
+        if conn is None:
+            conn = self.connect(read_only=True)
+            with self.lock:
+                self.readers.append(conn)
+
+        previous = getattr(self.local, 'conn', None)
+        self.local.conn = conn
+        try:
+            yield conn
+        finally:
+            self.local.conn = previous
+            with self.lock:
+                if len(self.idle_readers) < MAX_IDLE_READERS:
+                    self.idle_readers.append(conn)
+                    conn = None
+                else:
+                    self.readers.remove(conn)
+            if conn is not None:
+                conn.close()
+
+    def begin_write(self):
+        # Yazma kilidini işlemin başında al; böylece işlem ortasında
+        # "database is locked" hatası oluşmaz. Yarım kalmış bir işleme katılınmaz;
+        # aksi halde onun değişiklikleri bu işlemle birlikte kaydedilirdi.
+        if self.writer.in_transaction:
+            raise Exception("Yazma bağlantısında tamamlanmamış bir işlem var")
+
+        delay = 0.05
+        for attempt in range(WRITE_RETRIES):
+            try:
+                self.writer.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, 2)
+
+    def close(self):
+        with self.lock:
+            for conn in self.readers:
+                conn.close()
+            self.readers.clear()
+            self.idle_readers.clear()
+        self.writer.close()
@@ -1,29 +1,507 @@
+import re
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
+from connection import ConnectionManager
+from query_cache import QueryCache, cache_key, DEFAULT_MAX_ROWS
+
+# Temel şema; çalışma dizininden bağımsız olarak depodaki dosyadan okunur
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "database" / "schema.sql"
+
+# İşlemlerde girilen tutar alanları
+AMOUNT_FIELDS = ['expense', 'payment_received', 'check_received', 'check_given',
+                 'apartment_sale', 'invoice_amount']
+
+# Özet tablosunda toplanan tutar alanları (total_amount 5. göçle eklendi)
+BALANCE_FIELDS = AMOUNT_FIELDS + ['total_amount']
+
+# İşlemlerin girilen tüm sayısal alanları
+NUMERIC_FIELDS = AMOUNT_FIELDS + ['quantity', 'unit_price']
+
+# Özet anahtarları: eksik başlık/kasa sahibi/inşaat grubu 0 olarak tutulur
+BALANCE_KEYS = ['cash_owner_id', 'title_id', 'construction_group_id', 'month']
+
+
+def balance_upsert_sql(row, sign, fields):
+    # `row` (NEW/OLD) satırının tutarlarını özet tablosuna ekler (sign=1) veya düşer (sign=-1)
+    keys = [f"COALESCE({row}.cash_owner_id, 0)", f"COALESCE({row}.title_id, 0)",
+            f"COALESCE({row}.construction_group_id, 0)", f"substr({row}.date, 1, 7)"]
+    values = [str(sign)] + [f"{sign} * COALESCE({row}.{field}, 0)" for field in fields]
+    columns = ['transaction_count'] + fields
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in columns)
+    sql = f"""
+            INSERT INTO balance_summary ({", ".join(BALANCE_KEYS + columns)})
+            VALUES ({", ".join(keys + values)})
+            ON CONFLICT ({", ".join(BALANCE_KEYS)}) DO UPDATE SET {updates};"""
+    if sign < 0:
+        conditions = " AND ".join(f"{key} = {value}" for key, value in zip(BALANCE_KEYS, keys))
+        sql += f"""
+            DELETE FROM balance_summary WHERE {conditions} AND transaction_count = 0;"""
+    return sql
+
+
+def balance_triggers_sql(fields):
+    # Özet tablosunu işlemlerle birlikte güncel tutan tetikleyiciler
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_insert
+    AFTER INSERT ON transactions BEGIN {balance_upsert_sql('NEW', 1, fields)}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_delete
+    AFTER DELETE ON transactions BEGIN {balance_upsert_sql('OLD', -1, fields)}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_update
+    AFTER UPDATE ON transactions BEGIN {balance_upsert_sql('OLD', -1, fields)} {balance_upsert_sql('NEW', 1, fields)}
+    END;
+"""
+
+
+def balance_backfill_sql(fields):
+    # Mevcut işlemlerden özet tablosunu baştan oluşturur
+    return f"""
+    DELETE FROM balance_summary;
+    INSERT INTO balance_summary ({", ".join(BALANCE_KEYS)}, transaction_count, {", ".join(fields)})
+    SELECT COALESCE(cash_owner_id, 0), COALESCE(title_id, 0), COALESCE(construction_group_id, 0),
+           substr(date, 1, 7), COUNT(*), {", ".join(f"TOTAL({field})" for field in fields)}
+    FROM transactions
+    GROUP BY 1, 2, 3, 4;
+"""
+
+
+def balance_add_sql(fields, condition):
+    # Koşula uyan işlemlerin tutarlarını özet tablosundaki değerlere ekler
+    columns = ['transaction_count'] + fields
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in columns)
+    return f"""
+    INSERT INTO balance_summary ({", ".join(BALANCE_KEYS + columns)})
+    SELECT COALESCE(cash_owner_id, 0), COALESCE(title_id, 0), COALESCE(construction_group_id, 0),
+           substr(date, 1, 7), COUNT(*), {", ".join(f"TOTAL({field})" for field in fields)}
+    FROM transactions
+    WHERE {condition}
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT ({", ".join(BALANCE_KEYS)}) DO UPDATE SET {updates};
+"""
+
+
+# Göçler yazıldıkları andaki şemaya uygulanır: 2. göç total_amount sütunundan
+# önce geldiği için yalnızca AMOUNT_FIELDS ile çalışır
+BALANCE_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS balance_summary (
+        cash_owner_id INTEGER NOT NULL,
+        title_id INTEGER NOT NULL,
+        construction_group_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        transaction_count INTEGER NOT NULL DEFAULT 0,
+        {", ".join(f"{field} REAL NOT NULL DEFAULT 0" for field in AMOUNT_FIELDS)},
+        PRIMARY KEY ({", ".join(BALANCE_KEYS)})
+    ) WITHOUT ROWID;
+""" + balance_triggers_sql(AMOUNT_FIELDS)
+
+
+def fold_turkish(text):
+    # Türkçe I/İ/ı/i harflerini tek biçime indirir; diğer büyük/küçük harf ve
+    # ş/ğ/ç/ö/ü gibi işaretler FTS5 unicode61 belirteçleyicisi tarafından katlanır
+    return text.replace('İ', 'i').replace('I', 'i').replace('ı', 'i')
+
+
+def fold_turkish_sql(expression):
+    # fold_turkish ile aynı dönüşümün SQL karşılığı (tetikleyicilerde kullanılır)
+    return f"replace(replace(replace(COALESCE({expression}, ''), 'İ', 'i'), 'I', 'i'), 'ı', 'i')"
+
+
+def fts_values_sql(row):
+    return f"{row}.id, {fold_turkish_sql(f'{row}.company_name')}, {fold_turkish_sql(f'{row}.description')}"
+
+
+# Arama dizinini işlemlerle birlikte güncel tutan tetikleyiciler
+SEARCH_TRIGGERS = f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+    AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, company_name, description)
+        VALUES ({fts_values_sql('NEW')});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+    AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, company_name, description)
+        VALUES ('delete', {fts_values_sql('OLD')});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+    AFTER UPDATE OF company_name, description ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, company_name, description)
+        VALUES ('delete', {fts_values_sql('OLD')});
+        INSERT INTO transactions_fts (rowid, company_name, description)
+        VALUES ({fts_values_sql('NEW')});
+    END;
+"""
+
+# Firma adı ve açıklama üzerinde tam metin dizini. İçeriksiz (content='') tablo
+# yalnızca dizini tutar; metinler transactions tablosunda kalır.
+SEARCH_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        company_name, description, content = '', tokenize = 'unicode61 remove_diacritics 2'
+    );
+"""
+
+SEARCH_SCHEMA = f"""
+    {SEARCH_TABLE}
+    {SEARCH_TRIGGERS}
+    INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all');
+    INSERT INTO transactions_fts (rowid, company_name, description)
+    SELECT {fts_values_sql('transactions')} FROM transactions;
+"""
+
+# Filtrelerde kullanılan tarih, başlık ve kasa sahibi dizinleri
+FILTER_INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_title ON transactions (title_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_cash_owner ON transactions (cash_owner_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_construction_group ON transactions (construction_group_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_cash_owner_date ON transactions (cash_owner_id, date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_title_date ON transactions (title_id, date);
+"""
+
+# Tablo görünümünde sıralanabilen tutar ve firma sütunları için dizinler
+SORT_INDEXES = "".join(
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_transactions_{field} ON transactions ({field});"""
+    for field in AMOUNT_FIELDS + ['company_name']
+)
+
+# Girilen sütunlar (total_amount hesaplanır, INSERT'lerde verilmez)
+TRANSACTION_COLUMNS = ("id, title_id, cash_owner_id, date, company_name, construction_group_id, "
+                       "description, " + ", ".join(NUMERIC_FIELDS))
+
+
+def transactions_table_sql(name, foreign_keys=True):
+    # İşlemler tablosunun güncel tanımı; arşiv dosyalarında ad tabloları bulunmadığından
+    # yabancı anahtarlar olmadan oluşturulur
+    sql = f"""
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title_id INTEGER,
+        cash_owner_id INTEGER,
+        date TEXT NOT NULL,
+        company_name TEXT,
+        construction_group_id INTEGER,
+        description TEXT,
+        expense REAL,
+        payment_received REAL,
+        check_received REAL,
+        check_given REAL,
+        apartment_sale REAL,
+        invoice_amount REAL,
+        quantity REAL,
+        unit_price REAL,
+        total_amount REAL GENERATED ALWAYS AS (quantity * unit_price) STORED"""
+    if foreign_keys:
+        sql += """,
+        FOREIGN KEY (title_id) REFERENCES titles (id),
+        FOREIGN KEY (cash_owner_id) REFERENCES cash_owners (id),
+        FOREIGN KEY (construction_group_id) REFERENCES construction_groups (id)"""
+    return sql + "\n    );"
+
+
+# Satır toplamıyla sıralama ve aralık filtresi için
+TOTAL_AMOUNT_INDEX = "CREATE INDEX IF NOT EXISTS idx_transactions_total_amount ON transactions (total_amount);"
+
+# Satır toplamı (miktar × birim fiyat) saklanan üretilmiş sütun olarak eklenir.
+# SQLite ALTER TABLE ile STORED sütun ekleyemediğinden tablo yeniden oluşturulur;
+# id'ler ve AUTOINCREMENT sayacı korunduğu için arama dizini geçerli kalır, silinmiş
+# kayıtların id'leri yeniden verilmez. Eski tabloyla birlikte silinen
+# dizinler ve tetikleyiciler yeniden oluşturulur, özet tablosuna total_amount eklenir.
+TOTAL_AMOUNT_SCHEMA = f"""
+    {transactions_table_sql('transactions_new')}
+
+    INSERT INTO transactions_new ({TRANSACTION_COLUMNS})
+    SELECT {TRANSACTION_COLUMNS} FROM transactions ORDER BY id;
+
+    INSERT INTO sqlite_sequence (name, seq) SELECT 'transactions_new', 0
+    WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'transactions_new');
+    UPDATE sqlite_sequence
+    SET seq = MAX(seq, COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'transactions'), 0))
+    WHERE name = 'transactions_new';
+
+    DROP TABLE transactions;
+    ALTER TABLE transactions_new RENAME TO transactions;
+
+    {FILTER_INDEXES}
+    {SORT_INDEXES}
+    {TOTAL_AMOUNT_INDEX}
+
+    ALTER TABLE balance_summary ADD COLUMN total_amount REAL NOT NULL DEFAULT 0;
+    {balance_triggers_sql(BALANCE_FIELDS)}
+    {balance_backfill_sql(BALANCE_FIELDS)}
+    {SEARCH_TRIGGERS}
+"""
+
+# Veri değiştikçe artan sayaç (rapor önbelleğinin anahtarında kullanılır). Tetikleyiciler
+# uygulama dışından yapılan değişiklikleri de sayar; raporlarda görünen ad tabloları dahildir.
+REVISION_TABLES = ['transactions', 'titles', 'cash_owners', 'construction_groups']
+
+REVISION_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS data_revision (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        revision INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO data_revision (id, revision) VALUES (1, 0);
+""" + "".join(
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_revision_{event.lower()}
+    AFTER {event} ON {table} BEGIN
+        UPDATE data_revision SET revision = revision + 1;
+    END;"""
+    for table in REVISION_TABLES for event in ('INSERT', 'UPDATE', 'DELETE')
+)
+
+# Veritabanı kimliği: oluşturulurken bir kez üretilen rastgele değer. Sayaç yeniden
+# oluşturulan veritabanlarında 0'dan başladığından rapor önbelleği kimliği de kullanır.
+DATA_IDENTITY_SCHEMA = """
+    ALTER TABLE data_revision ADD COLUMN token TEXT NOT NULL DEFAULT '';
+    UPDATE data_revision SET token = lower(hex(randomblob(16)));
+"""
+
+# Dönem kapanışında (Database.close_period) kapanan yılların işlemleri veritabanının
+# yanındaki bu klasörde yıl başına bir arşiv dosyasına taşınır
+ARCHIVE_DIR_NAME = "arsiv"
+
+# Ana veritabanındaki arşiv listesi; dosya yolu veritabanı klasörüne göredir
+ARCHIVES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS archives (
+        year INTEGER PRIMARY KEY,
+        file TEXT NOT NULL,
+        transaction_count INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+# Arşiv dosyasının şeması: işlemler, ana tablodaki dizinler ve arama dizini.
+# Ad tabloları ve özet tablosu yalnızca ana veritabanında tutulur.
+ARCHIVE_VERSION = 1
+ARCHIVE_SCHEMA = f"""
+    {transactions_table_sql('transactions', foreign_keys=False)}
+    {FILTER_INDEXES}
+    {SORT_INDEXES}
+    {TOTAL_AMOUNT_INDEX}
+    {SEARCH_TABLE}
+"""
+
+# Ana veritabanında bulunmayan (arşivlenmiş) işlem düzenlenmek veya silinmek istendiğinde
+ARCHIVED_TRANSACTION_MESSAGE = "İşlem bulunamadı; kapanmış dönemlere ait işlemler değiştirilemez."
+
+# Şema göçleri: (sürüm, SQL). Uygulanan son sürüm PRAGMA user_version'da tutulur.
+# Yeni bir göç eklerken listenin sonuna bir sonraki sürüm numarasıyla ekleyin.
+MIGRATIONS = [
+    (1, FILTER_INDEXES),
+    # Kasa sahibi / başlık / inşaat grubu / ay bazında tetikleyicilerle güncel tutulan özet
+    (2, BALANCE_SCHEMA + balance_backfill_sql(AMOUNT_FIELDS)),
+    # Firma adı ve açıklamada arama
+    (3, SEARCH_SCHEMA),
+    # Sütun başlığıyla sıralamada ORDER BY ... LIMIT için tam tarama ve sıralama yapılmaz
+    (4, SORT_INDEXES),
+    # Satır toplamı için saklanan, dizinli total_amount sütunu
+    (5, TOTAL_AMOUNT_SCHEMA),
+    # Veri değişikliği sayacı
+    (6, REVISION_SCHEMA),
+    # Yıllık arşiv dosyalarının listesi
+    (7, ARCHIVES_SCHEMA),
+    # Veritabanı kimliği
+    (8, DATA_IDENTITY_SCHEMA),
+]
+
+# Ad listesi olarak önbelleğe alınan tablolar
+LOOKUP_TABLES = ('titles', 'cash_owners', 'construction_groups')
+
+
+class Lookup:
+    def __init__(self, rows):
+        self.rows = rows
+        self.by_id = {row['id']: row['name'] for row in rows}
+        self.by_name = {row['name']: row['id'] for row in rows}
+
 
 class Database:
-    def __init__(self):
-        self.db_path = Path("database/muhasebe.db")
+    def __init__(self, db_path="database/muhasebe.db", query_cache_rows=DEFAULT_MAX_ROWS):
+        self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
-        self.conn = sqlite3.connect(str(self.db_path))
-        self.conn.row_factory = sqlite3.Row
+        # Yazmalar tek bağlantıdan (self.conn), okumalar iş parçacığı başına
+        # salt okunur bağlantılardan yapılır
+        self.connections = ConnectionManager(self.db_path)
+        self.conn = self.connections.writer
+        # Başlık, kasa sahibi ve inşaat grubu önbelleği; add_*/delete_* metodları ve
+        # başka bağlantıların (diğer iş istasyonlarının) commit'leri geçersiz kılar
+        self.lookups = {}
+        self.lookup_data_version = None
+        self.lookup_listeners = []
+        # Kaydedilmemiş eklemeler nedeniyle commit sonrasında geçersiz kılınacak tablolar
+        self.pending_invalidations = set()
+        # transaction() blok derinliği; iç bloklar SAVEPOINT ile çalışır
+        self.transaction_depth = 0
+        # Her commit'te artar; get_transactions/count_transactions önbelleğindeki
+        # eski sonuçlar bununla geçersiz sayılır
+        self.write_generation = 0
+        self.query_cache = QueryCache(query_cache_rows) if query_cache_rows else None
         self.create_tables()
 
+    def read_connection(self):
+        # Çağıran iş parçacığının salt okunur bağlantısı
+        return self.connections.reader()
+
+    def begin_write(self):
+        self.connections.begin_write()
+
+    @contextmanager
+    def transaction(self):
+        # Yazma işlemi birimi: blok hatasız biterse commit, hata olursa rollback.
+        # İç içe kullanılabilir; iç bloklar SAVEPOINT ile çalışır ve hatada yalnızca
+        # kendi değişikliklerini geri alır, kalıcı kayıt en dıştaki blokta yapılır.
+        # Birden çok kaydı tek blokta yazmak tek bir commit (ve fsync) demektir.
+        if self.transaction_depth:
+            savepoint = f"sp_{self.transaction_depth}"
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+            self.transaction_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                raise
+            finally:
+                self.transaction_depth -= 1
+                self.conn.execute(f"RELEASE {savepoint}")
+            return
+
+        self.begin_write()
+        self.transaction_depth = 1
+        try:
+            yield self.conn
+        except BaseException:
+            self.transaction_depth = 0
+            self.rollback()
+            raise
+        self.transaction_depth = 0
+        try:
+            self.commit()
+        except BaseException:
+            # Kaydedilemeyen (ör. kilit nedeniyle) işlem açık bırakılmaz
+            self.rollback()
+            raise
+
+    def commit(self):
+        self.conn.commit()
+        self.write_generation += 1
+        self.flush_invalidations()
+
+    def external_write(self):
+        # Aynı veritabanına başka bir bağlantıdan (ör. arka planda içe aktarma) yazıldıktan
+        # sonra çağrılır: önbellekteki sorgu sonuçları ve ad listeleri yenilenir
+        self.write_generation += 1
+        self.refresh_lookups()
+
+    def rollback(self):
+        self.conn.rollback()
+        self.flush_invalidations()
+
+    def flush_invalidations(self):
+        # Okuyucular yalnızca kaydedilmiş verileri görür; önbellek commit'ten sonra yenilenir
+        tables, self.pending_invalidations = self.pending_invalidations, set()
+        for table in tables:
+            self.invalidate_lookup(table)
+
     def create_tables(self):
-        with open("database/schema.sql", "r", encoding="utf-8") as f:
+        # Şema güncelse (tüm göçler uygulanmışsa) açılışta şema betiği çalıştırılmaz
+        if self.schema_version() >= MIGRATIONS[-1][0]:
+            return
+
+        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
             self.conn.executescript(f.read())
         self.conn.commit()
+        self.migrate()
 
-    def add_title(self, name):
+    def schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def data_revision(self, conn=None):
+        # İşlemler veya başlık/kasa sahibi/inşaat grubu adları her değiştiğinde artar
+        cursor = (conn or self.read_connection()).cursor()
+        return cursor.execute("SELECT revision FROM data_revision").fetchone()[0]
+
+    def data_identity(self, conn=None):
+        # Veritabanına özgü değer; aynı klasördeki başka bir veritabanında veya aynı adla
+        # yeniden oluşturulan veritabanında farklıdır
+        cursor = (conn or self.read_connection()).cursor()
+        return cursor.execute("SELECT token FROM data_revision").fetchone()[0]
+
+    def migrate(self):
+        version = self.schema_version()
+        for target, script in MIGRATIONS:
+            if version >= target:
+                continue
+            # Her göç kendi işlemi içinde sürüm numarasıyla birlikte uygulanır
+            self.conn.executescript(
+                f"BEGIN IMMEDIATE; {script} PRAGMA user_version = {target}; COMMIT;"
+            )
+            version = target
+
+    def lookup(self, table):
+        self.refresh_lookups()
+        if table not in self.lookups:
+            cursor = self.read_connection().cursor()
+            rows = cursor.execute(f"SELECT id, name FROM {table} ORDER BY id").fetchall()
+            self.lookups[table] = Lookup(rows)
+        return self.lookups[table]
+
+    def refresh_lookups(self):
+        # PRAGMA data_version başka bir bağlantı veritabanına yazdığında değişir; bu
+        # durumda ad listeleri yeniden okunur. Bu bağlantının kendi yazmaları sayacı
+        # değiştirmez, onlar commit sonrasında flush_invalidations ile yenilenir.
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.lookup_data_version:
+            return
+        self.lookup_data_version = version
+        for table in LOOKUP_TABLES:
+            if table in self.lookups:
+                self.invalidate_lookup(table)
+
+    def invalidate_lookup(self, table):
+        self.lookups.pop(table, None)
+        for callback in self.lookup_listeners:
+            callback(table)
+
+    def add_lookup_listener(self, callback):
+        # callback(table) önbellek geçersiz kılındığında çağrılır
+        self.lookup_listeners.append(callback)
+
+    def construction_group_id(self, name):
+        # İnşaat grubu adını önbellekten bul, yoksa ekle
+        if not name:
+            return None
+        group_id = self.lookup('construction_groups').by_name.get(name)
+        if group_id is None:
+            group_id = self.name_id('construction_groups', name)
+        return group_id
+
+    def name_id(self, table, name):
+        # Önbellekte olmayan adın id'si; ad yoksa eklenir. Ad, önbellek okunduktan sonra
+        # başka bir iş istasyonu tarafından eklenmiş olabilir: ekleme çakışmada atlanır
+        # ve id tablodan okunur.
         cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO titles (name) VALUES (?)", (name,))
-        self.conn.commit()
+        cursor.execute(f"INSERT INTO {table} (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (name,))
+        self.pending_invalidations.add(table)
+        return cursor.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+
+    def add_title(self, name):
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT INTO titles (name) VALUES (?)", (name,))
+            self.pending_invalidations.add('titles')
         return cursor.lastrowid
 
     def add_cash_owner(self, name):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO cash_owners (name) VALUES (?)", (name,))
-        self.conn.commit()
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT INTO cash_owners (name) VALUES (?)", (name,))
+            self.pending_invalidations.add('cash_owners')
         return cursor.lastrowid
 
     def add_transaction(self, data):
@@ -35,23 +513,17 @@ class Database:
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
-        # İnşaat grubu adını ekle veya mevcut olanı bul
-        construction_group_name = data.get('construction_group', '')
-        construction_group_id = None
-        if construction_group_name:
+        with self.transaction():
+            # İnşaat grubu adını ekle veya mevcut olanı bul
+            construction_group_id = self.construction_group_id(data.get('construction_group', ''))
             cursor = self.conn.cursor()
-            # Önce var mı diye kontrol et
-            result = cursor.execute("SELECT id FROM construction_groups WHERE name = ?", 
-                                  (construction_group_name,)).fetchone()
-            if result:
-                construction_group_id = result['id']
-            else:
-                # Yoksa yeni ekle
-                cursor.execute("INSERT INTO construction_groups (name) VALUES (?)", 
-                             (construction_group_name,))
-                construction_group_id = cursor.lastrowid
-        
-        params = [
+            cursor.execute(query, self.transaction_params(data, construction_group_id))
+
+        # Eklenen satırı tablo görünümünün kullandığı biçimde döndür
+        return self.get_transaction(cursor.lastrowid)
+
+    def transaction_params(self, data, construction_group_id):
+        return [
             data['title_id'],
             data['cash_owner_id'],
             construction_group_id,  # İnşaat grubu ID'si
@@ -67,64 +539,442 @@ class Database:
             data['quantity'],
             data['unit_price']
         ]
-        
-        self.execute_query(query, params)
+
+    def add_transactions_bulk(self, records):
+        # Toplu ekleme: tüm kayıtlar tek bir işlem içinde executemany ile yazılır.
+        # Başlık, kasa sahibi ve inşaat grubu adları bellekteki ad→id eşlemeleriyle
+        # çözülür; olmayanlar eklenir. Kayıtlarda 'title_id'/'cash_owner_id' yerine
+        # 'title'/'cash_owner' adları da verilebilir.
+        query = """
+            INSERT INTO transactions (
+                title_id, cash_owner_id, construction_group_id, date, company_name, description,
+                expense, payment_received, check_received, check_given,
+                apartment_sale, invoice_amount, quantity, unit_price
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        name_maps = {table: dict(self.lookup(table).by_name) for table in LOOKUP_TABLES}
+
+        def resolve(table, name):
+            if not name:
+                return None
+            names = name_maps[table]
+            if name not in names:
+                names[name] = self.name_id(table, name)
+            return names[name]
+
+        def rows():
+            for data in records:
+                title_id = data.get('title_id') or resolve('titles', data.get('title'))
+                cash_owner_id = data.get('cash_owner_id') or resolve('cash_owners', data.get('cash_owner'))
+                yield (
+                    title_id,
+                    cash_owner_id,
+                    resolve('construction_groups', data.get('construction_group')),
+                    data['date'],
+                    data.get('company_name'),
+                    data.get('description'),
+                    data.get('expense', 0),
+                    data.get('payment_received', 0),
+                    data.get('check_received', 0),
+                    data.get('check_given', 0),
+                    data.get('apartment_sale', 0),
+                    data.get('invoice_amount', 0),
+                    data.get('quantity', 0),
+                    data.get('unit_price', 0)
+                )
+
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.executemany(query, rows())
+        return cursor.rowcount
 
     def get_titles(self):
-        cursor = self.conn.cursor()
-        return cursor.execute("SELECT * FROM titles").fetchall()
+        return self.lookup('titles').rows
 
     def get_cash_owners(self):
-        cursor = self.conn.cursor()
-        return cursor.execute("SELECT * FROM cash_owners").fetchall()
+        return self.lookup('cash_owners').rows
 
-    def get_transactions(self, filters=None):
-        query = """
-            SELECT t.*, 
-                   title.name as title_name, 
-                   cash_owner.name as cash_owner_name,
-                   cg.name as construction_group_name
-            FROM transactions t
+    # Sıralanabilir sütunlar ve SQL karşılıkları
+    SORT_COLUMNS = {
+        'date': 't.date',
+        'title_name': 'title.name',
+        'cash_owner_name': 'cash_owner.name',
+        'construction_group_name': 'cg.name',
+        'company_name': 't.company_name',
+        'description': 't.description',
+        'expense': 't.expense',
+        'payment_received': 't.payment_received',
+        'check_received': 't.check_received',
+        'check_given': 't.check_given',
+        'apartment_sale': 't.apartment_sale',
+        'invoice_amount': 't.invoice_amount',
+        'quantity': 't.quantity',
+        'unit_price': 't.unit_price',
+        'total_amount': 't.total_amount',
+        # Yalnızca arama yapılırken (en iyi eşleşme önce)
+        # Tekli + ile FTS5'in 'rank = ?' kısıtını rank ayarı olarak yorumlaması önlenir
+        'rank': '+fts.rank'
+    }
+
+    # İşlem satırlarına başlık, kasa sahibi ve inşaat grubu adlarını ekleyen birleştirmeler
+    NAME_JOINS = """
             LEFT JOIN titles title ON t.title_id = title.id
             LEFT JOIN cash_owners cash_owner ON t.cash_owner_id = cash_owner.id
             LEFT JOIN construction_groups cg ON t.construction_group_id = cg.id
-            WHERE 1=1
-        """
+    """
+
+    def search_expression(self, text):
+        # Kullanıcı metnini FTS5 sorgusuna çevirir: her kelime önek olarak aranır
+        terms = [term.replace('"', '""') for term in fold_turkish(text).split()]
+        return " ".join(f'"{term}"*' for term in terms if term.strip('"'))
+
+    def build_search_join(self, filters, schema='main'):
+        # schema: işlemlerin okunduğu veritabanı; arşivlerin kendi arama dizini vardır
+        expression = self.search_expression(filters.get('search') or '') if filters else ''
+        if not expression:
+            return "", []
+        table = "transactions_fts" if schema == 'main' else f"{schema}.transactions_fts"
+        return (f"""
+            JOIN (SELECT rowid, rank FROM {table} WHERE transactions_fts MATCH ?) fts
+                ON fts.rowid = t.id
+        """, [expression])
+
+    def default_order(self, filters):
+        # Arama yapılırken sonuçlar eşleşme derecesine, aksi halde tarihe göre sıralanır
+        if self.build_search_join(filters)[0]:
+            return ('rank', False)
+        return ('date', True)
+
+    def build_filter_clause(self, filters):
+        clause = ""
         params = []
 
         if filters:
             if 'date_range' in filters:
                 start_date, end_date = filters['date_range']
-                query += " AND date BETWEEN ? AND ?"
+                clause += " AND t.date BETWEEN ? AND ?"
                 params.extend([start_date, end_date])
             
+            # None verilirse başlığı/kasa sahibi boş olan işlemler seçilir
             if 'title_id' in filters:
-                query += " AND title_id = ?"
+                clause += " AND t.title_id IS ?"
                 params.append(filters['title_id'])
             
             if 'cash_owner_id' in filters:
-                query += " AND cash_owner_id = ?"
+                clause += " AND t.cash_owner_id IS ?"
                 params.append(filters['cash_owner_id'])
 
-        query += " ORDER BY date DESC"
+            if 'total_range' in filters:
+                # Satır toplamı aralığı; sınırlardan biri None ise o yönde sınır yoktur
+                min_total, max_total = filters['total_range']
+                if min_total is not None:
+                    clause += " AND t.total_amount >= ?"
+                    params.append(min_total)
+                if max_total is not None:
+                    clause += " AND t.total_amount <= ?"
+                    params.append(max_total)
+
+        return clause, params
+
+    def resolve_order(self, order_by=None, filters=None):
+        # Geçerli (sütun, azalan mı) çifti; eşleşme derecesi yalnızca aramada kullanılabilir
+        column, descending = order_by or self.default_order(filters)
+        if column == 'rank' and not self.build_search_join(filters)[0]:
+            column, descending = ('date', True)
+        if column not in self.SORT_COLUMNS:
+            raise Exception(f"Geçersiz sıralama sütunu: {column}")
+        return column, descending
+
+    def build_order_clause(self, order_by=None, filters=None, compound=False):
+        # Eşitlikte id ile kararlı sıralama. Arşivlerle birleştirilmiş (UNION ALL)
+        # sorgular sonuç sütunlarının adlarıyla sıralanır; SORT_COLUMNS anahtarları bu adlardır.
+        column, descending = self.resolve_order(order_by, filters)
+        direction = "DESC" if descending else "ASC"
+        if compound:
+            return f" ORDER BY {column} {direction}, id {direction}"
+        return f" ORDER BY {self.SORT_COLUMNS[column]} {direction}, t.id {direction}"
+
+    def transaction_arms(self, filters, conn, select, joins="", where=None):
+        # Filtrelenmiş işlem sorgusu ana veritabanı ve tarih aralığıyla çakışan her arşiv
+        # için bir parça olarak kurulur: [(SQL, parametreler)]. Parçalar UNION ALL ile
+        # birleştirilir; arşiv yoksa tek parça eski sorgunun aynısıdır.
+        clause, filter_params = self.build_filter_clause(filters)
+        if where is not None:
+            clause += where[0]
+            filter_params += where[1]
+
+        arms = []
+        for schema in ['main'] + self.archive_schemas(filters, conn):
+            table = "transactions" if schema == 'main' else f"{schema}.transactions"
+            search_join, params = self.build_search_join(filters, schema)
+            arms.append((f"SELECT {select} FROM {table} t{joins}{search_join} WHERE 1=1{clause}",
+                         params + filter_params))
+        return arms
+
+    def transactions_source(self, filters, conn):
+        # Toplam sorgularının FROM kısmı: (kaynak, WHERE koşulu, parametreler). Arşiv
+        # okunmuyorsa ana tablo ve filtre koşulu, okunuyorsa parçaların birleşimi
+        # (t adlı alt sorgu) döner.
+        arms = self.transaction_arms(filters, conn, "t.*")
+        if len(arms) == 1:
+            search_join, params = self.build_search_join(filters)
+            clause, filter_params = self.build_filter_clause(filters)
+            return "transactions t" + search_join, " WHERE 1=1" + clause, params + filter_params
+        query = " UNION ALL ".join(arm for arm, _ in arms)
+        return f"({query}) t", "", [param for _, arm_params in arms for param in arm_params]
+
+    def get_transactions(self, filters=None, limit=None, offset=0, order_by=None, conn=None):
+        return self.cached_query(
+            ('transactions', filters, limit, offset, self.resolve_order(order_by, filters)),
+            lambda: self.get_transactions_cursor(filters, limit, offset, order_by, conn).fetchall(),
+            conn, len)
+
+    def cached_query(self, key, function, conn=None, size=lambda result: 1):
+        # Önbellek açıksa aynı sorgunun son yazmadan sonraki sonucunu döner. Açık bir
+        # yazma işlemi içinden yazma bağlantısıyla yapılan okumalar önbelleğe girmez.
+        if self.query_cache is None or (conn is self.conn and self.transaction_depth):
+            return function()
+
+        key = cache_key(*key)
+        # Sayaç sorgudan önce okunur; sorgu sürerken yapılan bir yazma sonucu geçersiz kılar
+        generation = self.write_generation
+        result = self.query_cache.get(key, generation)
+        if result is None:
+            result = function()
+            self.query_cache.put(key, generation, result, size(result))
+        return list(result) if isinstance(result, list) else result
+
+    def iter_transactions(self, filters=None, batch_size=1000, order_by=None, conn=None):
+        # Satırları batch_size'lık parçalar halinde okuyarak tek tek verir;
+        # bellek kullanımı sonuç boyutundan bağımsızdır
+        cursor = self.get_transactions_cursor(filters, order_by=order_by, conn=conn)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def get_transactions_page(self, filters=None, after=None, limit=200, order_by=None, conn=None):
+        # Anahtar kümesiyle (keyset) sayfalama: `after` önceki sayfanın son satırının
+        # page_key değeridir, varsayılan sıralamada (tarih, id). OFFSET'ten farklı
+        # olarak her sayfa dizinden doğrudan okunur; süre sayfa numarasından bağımsızdır.
+        order_by = self.resolve_order(order_by, filters)
+        if after is None:
+            return self.get_transactions(filters, limit=limit, order_by=order_by, conn=conn)
+
+        # Sıradaki bölümler (NULL olmayan / NULL değerler) sayfa dolana kadar okunur
+        rows = []
+        for condition, params in self.build_after_conditions(order_by, after):
+            cursor = self.get_transactions_cursor(filters, limit - len(rows), order_by=order_by,
+                                                  conn=conn, where=(f" AND ({condition})", params))
+            rows.extend(cursor.fetchall())
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def page_key(self, trans, order_by=None, filters=None):
+        return (self.sort_value(trans, self.resolve_order(order_by, filters)), trans['id'])
+
+    def get_transactions_cursor(self, filters=None, limit=None, offset=0, order_by=None, conn=None,
+                                where=None):
+        # Ek koşul: where=(" AND ...", parametreler)
+        conn = conn or self.read_connection()
+        select = f"""t.*, 
+                   title.name as title_name, 
+                   cash_owner.name as cash_owner_name,
+                   cg.name as construction_group_name{", fts.rank as rank" if self.build_search_join(filters)[0] else ""}"""
+
+        arms = self.transaction_arms(filters, conn, select, self.NAME_JOINS, where)
+        query = " UNION ALL ".join(arm for arm, _ in arms)
+        params = [param for _, arm_params in arms for param in arm_params]
+        # Her parça kendi dizininden sıralı okunur ve sonuçlar birleştirilirken sıralanır
+        query += self.build_order_clause(order_by, filters, compound=len(arms) > 1)
+
+        # Sayfalı okuma (tablo modeli yalnızca görünen sayfaları ister)
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
         
-        return self.execute_query(query, params)
+        return conn.cursor().execute(query, params)
 
-    def update_transaction(self, transaction_id, data):
-        # İnşaat grubu güncelleme
-        construction_group_name = data.get('construction_group', '')
-        construction_group_id = None
-        if construction_group_name:
-            cursor = self.conn.cursor()
-            result = cursor.execute("SELECT id FROM construction_groups WHERE name = ?", 
-                                  (construction_group_name,)).fetchone()
-            if result:
-                construction_group_id = result['id']
-            else:
-                cursor.execute("INSERT INTO construction_groups (name) VALUES (?)", 
-                             (construction_group_name,))
-                construction_group_id = cursor.lastrowid
+    def sort_value(self, trans, order_by=None):
+        # Satırın sıralama sütunundaki değeri (SQL ifadesiyle aynı anlamda)
+        column, _ = order_by or ('date', True)
+        return trans[column]
+
+    def build_after_conditions(self, order_by, key):
+        # Verilen sıralamada key=(değer, id) satırından sonra gelen satırların koşulları,
+        # sıradaki bölümler halinde. SQLite'ta NULL değerler artan sırada başta, azalan
+        # sırada sonda yer alır. Eşit değerler, kalan değerler ve NULL'lar ayrı bölümlerdir;
+        # böylece her bölüm sütunun dizininde aralık araması (SEARCH) olarak çalışır.
+        column, descending = order_by
+        expression = self.SORT_COLUMNS[column]
+        value, transaction_id = key
+
+        if descending:
+            if value is None:
+                return [(f"{expression} IS NULL AND t.id < ?", [transaction_id])]
+            return [(f"{expression} = ? AND t.id < ?", [value, transaction_id]),
+                    (f"{expression} < ?", [value]),
+                    (f"{expression} IS NULL", [])]
+
+        if value is None:
+            return [(f"{expression} IS NULL AND t.id > ?", [transaction_id]),
+                    (f"{expression} IS NOT NULL", [])]
+        return [(f"{expression} = ? AND t.id > ?", [value, transaction_id]),
+                    (f"{expression} > ?", [value])]
+
+    def build_before_clause(self, order_by, trans):
+        # Bir sıralamada `trans` satırından önce gelenler, ters sıralamada ondan sonra gelenlerdir
+        column, descending = order_by or ('date', True)
+        conditions = self.build_after_conditions((column, not descending),
+                                                 (self.sort_value(trans, order_by), trans['id']))
+        clause = " OR ".join(f"({condition})" for condition, _ in conditions)
+        return f" AND ({clause})", [param for _, params in conditions for param in params]
+
+    def count_transactions(self, filters=None, before=None, conn=None):
+        if before is None:
+            return self.cached_query(('count', filters),
+                                     lambda: self.count_rows(filters, None, conn), conn)
+        return self.count_rows(filters, before, conn)
+
+    def count_rows(self, filters, before, conn):
+        conn = conn or self.read_connection()
+        joins, where = "", None
+
+        # before=(order_by, satır): satırın sıralamadaki konumunu bulmak için
+        # ondan önce gelen satırları say
+        if before is not None:
+            order_by, trans = before
+            joins, where = self.NAME_JOINS, self.build_before_clause(order_by, trans)
+
+        arms = self.transaction_arms(filters, conn, "COUNT(*) as count", joins, where)
+        query = " UNION ALL ".join(arm for arm, _ in arms)
+        if len(arms) > 1:
+            query = f"SELECT SUM(count) as count FROM ({query})"
+        params = [param for _, arm_params in arms for param in arm_params]
+        return conn.cursor().execute(query, params).fetchone()['count']
+
+    # load_columns her seferinde bu kadar satırı NumPy dizisine çevirir
+    COLUMN_CHUNK_SIZE = 50000
+
+    def load_columns(self, filters=None, conn=None):
+        # Filtrelenmiş işlemlerin sütun bazlı anlık görüntüsü (analytics.ColumnarSnapshot).
+        # Satır nesneleri oluşturulmaz; değerler parça parça float64 dizilerine okunur.
+        from analytics import ColumnarSnapshot, SNAPSHOT_FIELDS
+        import numpy as np
+
+        numeric = ", ".join(f"COALESCE(t.{field}, 0)" for field in SNAPSHOT_FIELDS)
+        query = f"""
+            SELECT t.id,
+                   COALESCE(t.title_id, 0),
+                   COALESCE(t.cash_owner_id, 0),
+                   COALESCE(t.construction_group_id, 0),
+                   COALESCE(CAST(julianday(t.date) - 2440587.5 AS INTEGER), 0),
+                   {numeric}
+        """
+        conn = conn or self.read_connection()
+        source, clause, params = self.transactions_source(filters, conn)
+        query += f" FROM {source}{clause}"
+
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(self.COLUMN_CHUNK_SIZE)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.float64))
+        return ColumnarSnapshot.from_chunks(chunks)
+
+    # get_balances için gruplama anahtarları
+    BALANCE_GROUPS = {
+        'cash_owner': ('b.cash_owner_id', 'cash_owner.name', 'cash_owner_name'),
+        'title': ('b.title_id', 'title.name', 'title_name'),
+        'construction_group': ('b.construction_group_id', 'cg.name', 'construction_group_name'),
+        'month': ('b.month', None, None)
+    }
+
+    def get_balances(self, group_by=('cash_owner',), filters=None):
+        # Özet tablosundan gruplanmış toplamlar; işlem sayısından bağımsız olarak
+        # yalnızca grup sayısı kadar satır okunur.
+        # filters: title_id, cash_owner_id, construction_group_id, month_range=('YYYY-MM', 'YYYY-MM')
+        columns = []
+        group_columns = []
+        for key in group_by:
+            if key not in self.BALANCE_GROUPS:
+                raise Exception(f"Geçersiz gruplama: {key}")
+            id_column, name_column, name_alias = self.BALANCE_GROUPS[key]
+            columns.append(f"{id_column} as {id_column.split('.')[1]}")
+            group_columns.append(id_column)
+            if name_column:
+                columns.append(f"{name_column} as {name_alias}")
+
+        sums = [f"SUM(b.{field}) as {field}" for field in ['transaction_count'] + BALANCE_FIELDS]
+        query = f"""
+            SELECT {", ".join(columns + sums)},
+                   SUM(b.payment_received) - SUM(b.expense) as balance
+            FROM balance_summary b
+            LEFT JOIN titles title ON b.title_id = title.id
+            LEFT JOIN cash_owners cash_owner ON b.cash_owner_id = cash_owner.id
+            LEFT JOIN construction_groups cg ON b.construction_group_id = cg.id
+            WHERE 1=1
+        """
+        params = []
+
+        if filters:
+            for key in ('title_id', 'cash_owner_id', 'construction_group_id'):
+                if key in filters:
+                    query += f" AND b.{key} = ?"
+                    params.append(filters[key] or 0)
+            if 'month_range' in filters:
+                start_month, end_month = filters['month_range']
+                query += " AND b.month BETWEEN ? AND ?"
+                params.extend([start_month, end_month])
+
+        if group_columns:
+            query += f" GROUP BY {', '.join(group_columns)} ORDER BY {', '.join(group_columns)}"
+
+        cursor = self.read_connection().cursor()
+        return cursor.execute(query, params).fetchall()
+
+    # get_totals için gruplama anahtarları: (gruplama ifadesi, etiket ifadesi)
+    TOTAL_GROUPS = {
+        'title': ('t.title_id', 'title.name'),
+        'cash_owner': ('t.cash_owner_id', 'cash_owner.name'),
+        'construction_group': ('t.construction_group_id', 'cg.name'),
+        'month': ("substr(t.date, 1, 7)", "substr(t.date, 1, 7)")
+    }
+
+    def get_totals(self, group_by=None, filters=None, conn=None):
+        # İşlemlerin filtreye uyan toplamları, SQL'de GROUP BY ile hesaplanır.
+        # group_by None ise tek satırlık genel toplam döner; aksi halde her satırda
+        # grubun anahtarı 'group_id', etiketi 'name' sütunundadır. get_balances'tan
+        # farklı olarak gün bazında tarih aralığı ve arama filtrelerini de destekler.
+        sums = ", ".join(f"COALESCE(SUM(t.{field}), 0) as {field}" for field in NUMERIC_FIELDS)
+        select = f"""
+                   COUNT(*) as transaction_count, {sums},
+                   COALESCE(SUM(t.total_amount), 0) as total_amount,
+                   COALESCE(SUM(t.payment_received), 0) - COALESCE(SUM(t.expense), 0) as balance
+        """
+        if group_by is not None:
+            if group_by not in self.TOTAL_GROUPS:
+                raise Exception(f"Geçersiz gruplama: {group_by}")
+            group_column, name_column = self.TOTAL_GROUPS[group_by]
+            select = f"{group_column} as group_id, {name_column} as name, {select}"
+
+        conn = conn or self.read_connection()
+        source, clause, params = self.transactions_source(filters, conn)
+        query = f"SELECT {select} FROM {source}{self.NAME_JOINS}{clause}"
 
+        if group_by is not None:
+            query += f" GROUP BY {group_column} ORDER BY {name_column} IS NULL, {name_column}"
+
+        return conn.cursor().execute(query, params).fetchall()
+
+    def update_transaction(self, transaction_id, data):
         query = """
             UPDATE transactions SET
                 title_id = ?,
@@ -143,33 +993,26 @@ class Database:
                 unit_price = ?
             WHERE id = ?
         """
-        params = [
-            data['title_id'],
-            data['cash_owner_id'],
-            construction_group_id,
-            data['date'],
-            data['company_name'],
-            data['description'],
-            data['expense'],
-            data['payment_received'],
-            data['check_received'],
-            data['check_given'],
-            data['apartment_sale'],
-            data['invoice_amount'],
-            data['quantity'],
-            data['unit_price'],
-            transaction_id
-        ]
-        
-        self.execute_query(query, params)
+
+        with self.transaction():
+            # İnşaat grubu güncelleme
+            construction_group_id = self.construction_group_id(data.get('construction_group', ''))
+            params = self.transaction_params(data, construction_group_id) + [transaction_id]
+            if self.conn.execute(query, params).rowcount == 0:
+                raise Exception(ARCHIVED_TRANSACTION_MESSAGE)
+
+        # Güncellenen satırı tablo görünümünün kullandığı biçimde döndür
+        return self.get_transaction(transaction_id)
 
     def delete_transaction(self, transaction_id):
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
-        self.conn.commit()
+        with self.transaction():
+            if self.conn.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,)).rowcount == 0:
+                raise Exception(ARCHIVED_TRANSACTION_MESSAGE)
 
     def get_transaction(self, transaction_id):
-        cursor = self.conn.cursor()
+        # transaction() bloğu içindeyken kaydedilmemiş değişiklikleri görmek için yazma bağlantısı
+        conn = self.conn if self.transaction_depth else self.read_connection()
+        cursor = conn.cursor()
         return cursor.execute("""
             SELECT t.*, 
                    ti.name as title_name, 
@@ -182,38 +1025,210 @@ class Database:
             WHERE t.id = ?
         """, (transaction_id,)).fetchone()
 
+    # Aynı bağlantıya eklenebilecek veritabanı sayısı (SQLite'ın SQLITE_MAX_ATTACHED
+    # varsayılanı). Arşiv dosyası sayısı bunun bir eksiğinde tutulur (bkz. merge_archives);
+    # böylece tarih filtresiz sorgular da tüm arşivleri tek sorguda okuyabilir ve dönem
+    # kapanışı için bir yer kalır.
+    MAX_ATTACHED_ARCHIVES = 10
+    MAX_ARCHIVE_FILES = MAX_ATTACHED_ARCHIVES - 1
+
+    def get_archives(self, conn=None):
+        cursor = (conn or self.read_connection()).cursor()
+        return cursor.execute("SELECT year, file, transaction_count FROM archives ORDER BY year").fetchall()
+
+    def archive_files(self, conn):
+        # Arşiv dosyaları ve içerdikleri yıllar, en eski yıldan başlayarak: [(dosya, [yıllar])].
+        # Eski yıllar birleştirildiğinden bir dosya birden çok yıl içerebilir.
+        files = {}
+        for year, file in conn.execute("SELECT year, file FROM archives ORDER BY year"):
+            files.setdefault(file, []).append(year)
+        return list(files.items())
+
+    def archive_schema_name(self, file):
+        return "arsiv_" + re.sub(r"\W", "_", Path(file).stem)
+
+    def archive_schemas(self, filters, conn):
+        # Filtrenin tarih aralığıyla çakışan arşiv dosyalarını bağlantıya ekler (ATTACH)
+        # ve şema adlarını döner. Tarih filtresi yoksa tüm arşivler okunur; yalnızca açık
+        # dönemlere bakan sorgular arşivlere hiç dokunmaz.
+        files = self.archive_files(conn)
+        if filters and 'date_range' in filters:
+            start_date, end_date = filters['date_range']
+            files = [(file, years) for file, years in files
+                     if any(start_date < f"{year + 1:04d}-01-01" and end_date >= f"{year:04d}-01-01"
+                            for year in years)]
+        if not files:
+            return []
+
+        schemas = [self.archive_schema_name(file) for file, _ in files]
+        attached = [row[1] for row in conn.execute("PRAGMA database_list") if row[1].startswith("arsiv_")]
+        missing = [(schema, file) for schema, (file, _) in zip(schemas, files) if schema not in attached]
+        # Sınır aşılacaksa bu sorguda gerekmeyen (ör. birleştirilmiş eski) arşivler çıkarılır
+        unused = [schema for schema in attached if schema not in schemas]
+        for schema in unused[:max(0, len(attached) + len(missing) - self.MAX_ATTACHED_ARCHIVES)]:
+            conn.execute(f"DETACH DATABASE {schema}")
+        for schema, file in missing:
+            path = self.db_path.parent / file
+            if not path.exists():
+                raise Exception(f"Arşiv dosyası bulunamadı: {path}")
+            # Okuyucu bağlantılar salt okunur açılır (bkz. ConnectionManager.connect)
+            name = str(path) if conn is self.conn else f"{path.resolve().as_uri()}?mode=ro"
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (name,))
+        return schemas
+
+    def archive_path(self, first_year, last_year=None):
+        suffix = f"{first_year}" if last_year in (None, first_year) else f"{first_year}-{last_year}"
+        return self.db_path.parent / ARCHIVE_DIR_NAME / f"{self.db_path.stem}_{suffix}.db"
+
+    def create_archive(self, path):
+        path.parent.mkdir(exist_ok=True)
+        archive = sqlite3.connect(path)
+        try:
+            if archive.execute("PRAGMA user_version").fetchone()[0] == 0:
+                archive.executescript(f"BEGIN; {ARCHIVE_SCHEMA} PRAGMA user_version = {ARCHIVE_VERSION}; COMMIT;")
+        finally:
+            archive.close()
+
+    def detach_archives(self):
+        # Yazma bağlantısına okuma için eklenmiş arşivler; kapanış dosyaları değiştireceği
+        # ve eklenebilecek veritabanı sayısı sınırlı olduğu için çıkarılır
+        for row in self.conn.execute("PRAGMA database_list").fetchall():
+            if row[1].startswith("arsiv"):
+                self.conn.execute(f"DETACH DATABASE {row[1]}")
+
+    def close_period(self, year, vacuum=False):
+        # Dönem kapanışı: `year` yılından önceki işlemleri yıl başına bir arşiv dosyasına
+        # taşır ve taşınan işlem sayısını döner. Taşınan işlemler okuma sorgularında
+        # görünmeye devam eder (bkz. archive_schemas) ancak değiştirilemez; özet tablosu
+        # (get_balances) arşivlenen tutarları içermeye devam eder.
+        # vacuum: boşalan sayfalar VACUUM ile geri verilir (veritabanı yeniden yazılır)
+        if self.transaction_depth:
+            raise Exception("Dönem kapanışı açık bir işlem içinde yapılamaz")
+
+        self.detach_archives()
+        cutoff = f"{int(year):04d}-01-01"
+        years = [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT CAST(substr(date, 1, 4) AS INTEGER) FROM transactions WHERE date < ? ORDER BY 1",
+            (cutoff,))]
+        moved = sum(self.archive_year(archive_year) for archive_year in years)
+        self.merge_archives()
+        if vacuum and moved:
+            self.conn.execute("VACUUM")
+        return moved
+
+    def archive_year(self, year):
+        # Yıl daha önce kapanmışsa (ör. geriye tarihli yeni kayıtlar) mevcut dosyasına eklenir
+        row = self.conn.execute("SELECT file FROM archives WHERE year = ?", (year,)).fetchone()
+        file = row['file'] if row else f"{ARCHIVE_DIR_NAME}/{self.archive_path(year).name}"
+        path = self.db_path.parent / file
+        self.create_archive(path)
+
+        condition = "date >= ? AND date < ?"
+        bounds = (f"{year:04d}-01-01", f"{year + 1:04d}-01-01")
+        # ATTACH işlem içinde yapılamaz; taşıma ise iki dosyayı tek işlemde yazar. WAL
+        # kipinde çok dosyalı işlemler yalnızca dosya başına atomiktir: kopyalama ve
+        # silme arasında kesilen bir kapanış yeniden çalıştırıldığında zaten kopyalanmış
+        # satırlar atlanır.
+        self.conn.execute("ATTACH DATABASE ? AS arsiv", (str(path),))
+        try:
+            with self.transaction() as conn:
+                conn.execute(f"""
+                    INSERT INTO arsiv.transactions_fts (rowid, company_name, description)
+                    SELECT {fts_values_sql('transactions')} FROM main.transactions
+                    WHERE {condition} AND id NOT IN (SELECT id FROM arsiv.transactions)
+                """, bounds)
+                conn.execute(f"""
+                    INSERT OR IGNORE INTO arsiv.transactions ({TRANSACTION_COLUMNS})
+                    SELECT {TRANSACTION_COLUMNS} FROM main.transactions WHERE {condition}
+                """, bounds)
+                # Silme tetikleyicisi özet tablosundan düşeceği için tutarlar önce yeniden eklenir
+                conn.execute(balance_add_sql(BALANCE_FIELDS, condition), bounds)
+                moved = conn.execute(f"DELETE FROM main.transactions WHERE {condition}", bounds).rowcount
+                conn.execute(f"""
+                    INSERT INTO archives (year, file, transaction_count)
+                    VALUES (?, ?, (SELECT COUNT(*) FROM arsiv.transactions WHERE {condition}))
+                    ON CONFLICT (year) DO UPDATE SET
+                        file = excluded.file, transaction_count = excluded.transaction_count
+                """, (year, file, *bounds))
+        finally:
+            self.conn.execute("DETACH DATABASE arsiv")
+        return moved
+
+    def merge_archives(self):
+        # Arşiv dosyası sayısı MAX_ARCHIVE_FILES'ı aşarsa en eski iki dosya çok yıllı
+        # tek bir dosyada (ör. muhasebe_2010-2012.db) birleştirilir. Son yıllar ayrı
+        # dosyalarda kalır; yalnızca eski dönemlere bakan sorgular birleşik dosyayı okur.
+        while True:
+            files = self.archive_files(self.conn)
+            if len(files) <= self.MAX_ARCHIVE_FILES:
+                return
+            (first_file, first_years), (second_file, second_years) = files[:2]
+            years = first_years + second_years
+            path = self.archive_path(min(years), max(years))
+            file = f"{ARCHIVE_DIR_NAME}/{path.name}"
+            self.create_archive(path)
+
+            sources = [self.db_path.parent / first_file, self.db_path.parent / second_file]
+            self.conn.execute("ATTACH DATABASE ? AS arsiv", (str(path),))
+            self.conn.execute("ATTACH DATABASE ? AS arsiv_kaynak_1", (str(sources[0]),))
+            self.conn.execute("ATTACH DATABASE ? AS arsiv_kaynak_2", (str(sources[1]),))
+            try:
+                with self.transaction() as conn:
+                    for source in ("arsiv_kaynak_1", "arsiv_kaynak_2"):
+                        conn.execute(f"""
+                            INSERT OR IGNORE INTO arsiv.transactions ({TRANSACTION_COLUMNS})
+                            SELECT {TRANSACTION_COLUMNS} FROM {source}.transactions
+                        """)
+                    # İçeriksiz arama dizininden metin geri okunamaz; dizin satırlardan kurulur
+                    conn.execute("INSERT INTO arsiv.transactions_fts (transactions_fts) VALUES ('delete-all')")
+                    conn.execute(f"""
+                        INSERT INTO arsiv.transactions_fts (rowid, company_name, description)
+                        SELECT {fts_values_sql('transactions')} FROM arsiv.transactions
+                    """)
+                    conn.execute("UPDATE archives SET file = ? WHERE file IN (?, ?)",
+                                 (file, first_file, second_file))
+            finally:
+                for schema in ("arsiv", "arsiv_kaynak_1", "arsiv_kaynak_2"):
+                    self.conn.execute(f"DETACH DATABASE {schema}")
+
+            for source in sources:
+                try:
+                    source.unlink()
+                except OSError:
+                    pass  # Başka bir süreç dosyayı açık tutuyor (Windows); artık kullanılmaz
+
     def get_construction_groups(self):
-        cursor = self.conn.cursor()
-        return cursor.execute("SELECT * FROM construction_groups").fetchall()
+        return self.lookup('construction_groups').rows
 
     def add_construction_group(self, name):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO construction_groups (name) VALUES (?)", (name,))
-        self.conn.commit()
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT INTO construction_groups (name) VALUES (?)", (name,))
+            self.pending_invalidations.add('construction_groups')
         return cursor.lastrowid 
 
-    def execute_query(self, query, params):
-        cursor = self.conn.cursor()
-        return cursor.execute(query, params).fetchall() 
-
     def delete_title(self, title_id):
-        cursor = self.conn.cursor()
-        # Önce bu başlığa ait işlemleri kontrol et
-        transactions = cursor.execute("SELECT COUNT(*) as count FROM transactions WHERE title_id = ?", 
-                                    (title_id,)).fetchone()
-        if transactions['count'] > 0:
-            raise Exception("Bu başlığa ait işlemler bulunmaktadır. Önce işlemleri silmelisiniz.")
-        
-        cursor.execute("DELETE FROM titles WHERE id = ?", (title_id,))
-        self.conn.commit()
+        with self.transaction():
+            cursor = self.conn.cursor()
+            # Önce bu başlığa ait işlemleri kontrol et; özet tablosu arşivlenmiş işlemleri de sayar
+            transactions = cursor.execute("SELECT COALESCE(SUM(transaction_count), 0) as count "
+                                          "FROM balance_summary WHERE title_id = ?",
+                                          (title_id,)).fetchone()
+            if transactions['count'] > 0:
+                raise Exception("Bu başlığa ait işlemler bulunmaktadır. Önce işlemleri silmelisiniz.")
+
+            cursor.execute("DELETE FROM titles WHERE id = ?", (title_id,))
+            self.pending_invalidations.add('titles')
 
     def delete_cash_owner(self, cash_owner_id):
-        cursor = self.conn.cursor()
-        # Önce bu kasa sahibine ait işlemleri kontrol et
-        transactions = cursor.execute("SELECT COUNT(*) as count FROM transactions WHERE cash_owner_id = ?", 
-                                    (cash_owner_id,)).fetchone()
-        if transactions['count'] > 0:
-            raise Exception("Bu kasa sahibine ait işlemler bulunmaktadır. Önce işlemleri silmelisiniz.")
-        
-        cursor.execute("DELETE FROM cash_owners WHERE id = ?", (cash_owner_id,))
-        self.conn.commit() 
\ No newline at end of file
+        with self.transaction():
+            cursor = self.conn.cursor()
+            # Önce bu kasa sahibine ait işlemleri kontrol et; özet tablosu arşivlenmiş işlemleri de sayar
+            transactions = cursor.execute("SELECT COALESCE(SUM(transaction_count), 0) as count "
+                                          "FROM balance_summary WHERE cash_owner_id = ?",
+                                          (cash_owner_id,)).fetchone()
+            if transactions['count'] > 0:
+                raise Exception("Bu kasa sahibine ait işlemler bulunmaktadır. Önce işlemleri silmelisiniz.")
+
+            cursor.execute("DELETE FROM cash_owners WHERE id = ?", (cash_owner_id,))
+            self.pending_invalidations.add('cash_owners')
\ No newline at end of file
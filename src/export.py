@@ -0,0 +1,104 @@
+import csv
+from operator import itemgetter
+from importer import THOUSANDS_PATTERN
+
+# Düz metin (CSV/TSV) dışa aktarma; banka mutabakat aracı gibi programlar için.
+# Satırlar SQLite imlecinden parça parça okunup doğrudan dosyaya yazılır; satır
+# nesnesi ve hücre stili oluşturulmaz, bellek kullanımı defter boyutundan bağımsızdır.
+
+# Başlıklar importer.COLUMN_MAP ile uyumludur; dışa aktarılan dosya geri içe aktarılabilir
+EXPORT_COLUMNS = [
+    ("Tarih", 'date'),
+    ("Başlık", 'title_name'),
+    ("Kasa Sahibi", 'cash_owner_name'),
+    ("İnşaat Grubu", 'construction_group_name'),
+    ("Firma", 'company_name'),
+    ("Açıklama", 'description'),
+    ("Yapılan Ödeme", 'expense'),
+    ("Alınan Ödeme", 'payment_received'),
+    ("Alınan Çek", 'check_received'),
+    ("Verilen Çek", 'check_given'),
+    ("Daire Satış", 'apartment_sale'),
+    ("Fatura Tutarı", 'invoice_amount'),
+    ("Miktar", 'quantity'),
+    ("Birim Fiyat", 'unit_price'),
+    ("Toplam Tutar", 'total_amount'),
+]
+
+# İlk sayısal sütun; öncekiler metindir
+FIRST_NUMERIC_COLUMN = 6
+
+# Tutar olmayan sayısal sütunlar; kuruşa yuvarlanmaz, tam duyarlıkla yazılır
+# (ör. 0,125 birim fiyat). Yuvarlansa geri içe aktarılan satırın toplamı değişirdi.
+PRECISE_FIELDS = ('quantity', 'unit_price')
+
+# Biçim → varsayılan ayraç. Türkçe Excel ondalık virgül kullandığından CSV'de ';'
+TEXT_FORMATS = {'csv': ';', 'tsv': '\t'}
+
+# İmleçten bir seferde okunan satır sayısı
+CHUNK_SIZE = 10000
+
+
+def format_number(value, decimal_comma):
+    if value is None:
+        return ""
+    text = f"{value:.2f}"
+    return text.replace(".", ",") if decimal_comma else text
+
+
+def format_precise(value, decimal_comma):
+    # Değeri aynen geri veren en kısa gösterim; tam sayılar ondalıksız yazılır
+    if value is None:
+        return ""
+    text = repr(float(value))
+    if text.endswith(".0"):
+        text = text[:-2]
+    if decimal_comma:
+        return text.replace(".", ",")
+    # Nokta ondalıkta "2.375" içe aktarmada Türkçe binlik gösterimi (2375) sayılırdı;
+    # sona eklenen 0 ile dosya --decimal verilmeden de doğru okunur ("2.3750")
+    if THOUSANDS_PATTERN.fullmatch(text):
+        text += "0"
+    return text
+
+
+# Filtreye uyan işlemleri ayraçlı metin dosyasına yazar ve yazılan satır sayısını döner.
+# decimal_comma: 1234,56 (Türkçe) veya 1234.56; bom: Excel'in UTF-8 olarak tanıması
+# için dosya başına BOM yazılır. Kayıt yoksa dosya oluşturulmaz ve 0 döner.
+# progress(satır sayısı) her parçadan sonra çağrılır.
+def write_csv_report(database, filters, path, delimiter=';', decimal_comma=True, bom=True,
+                     progress=None):
+    cursor = database.get_transactions_cursor(filters)
+    # Satırlar düz demet olarak okunur; sütunlar imleç açıklamasından bulunur
+    cursor.row_factory = None
+    names = [description[0] for description in cursor.description]
+    text_columns = itemgetter(*[names.index(key) for _, key in EXPORT_COLUMNS[:FIRST_NUMERIC_COLUMN]])
+    numeric_keys = [key for _, key in EXPORT_COLUMNS[FIRST_NUMERIC_COLUMN:]]
+    numeric_columns = itemgetter(*[names.index(key) for key in numeric_keys])
+    # Her sayısal sütunun biçimleyicisi: tutarlar kuruşa yuvarlanır
+    formatters = [format_precise if key in PRECISE_FIELDS else format_number for key in numeric_keys]
+
+    rows = cursor.fetchmany(CHUNK_SIZE)
+    if not rows:
+        return 0
+
+    # Boş ve sıfır değerler (tutar alanlarının çoğu) önceden biçimlenmiş metinle yazılır
+    common = [{None: "", 0: formatter(0, decimal_comma)} for formatter in formatters]
+    numeric = list(zip(formatters, common))
+
+    def convert(row):
+        return (*text_columns(row),
+                *[known[value] if value in known else formatter(value, decimal_comma)
+                  for (formatter, known), value in zip(numeric, numeric_columns(row))])
+
+    count = 0
+    with open(path, "w", encoding="utf-8-sig" if bom else "utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow([header for header, _ in EXPORT_COLUMNS])
+        while rows:
+            writer.writerows(map(convert, rows))
+            count += len(rows)
+            if progress is not None:
+                progress(count)
+            rows = cursor.fetchmany(CHUNK_SIZE)
+    return count
@@ -0,0 +1,169 @@
+import argparse
+import csv
+import re
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# Dosya başlıkları → işlem alanları (Excel raporunun başlıkları da tanınır)
+COLUMN_MAP = {
+    "Tarih": 'date',
+    "Başlık": 'title',
+    "Kasa Sahibi": 'cash_owner',
+    "İnşaat Grubu": 'construction_group',
+    "Firma": 'company_name',
+    "Açıklama": 'description',
+    "Yapılan Ödeme": 'expense',
+    "Alınan Ödeme": 'payment_received',
+    "Alınan Çek": 'check_received',
+    "Verilen Çek": 'check_given',
+    "Daire Satış": 'apartment_sale',
+    "Fatura Tutarı": 'invoice_amount',
+    "Miktar": 'quantity',
+    "Birim Fiyat": 'unit_price',
+    "Birim Fiyatı": 'unit_price'
+}
+
+NUMERIC_FIELDS = ['expense', 'payment_received', 'check_received', 'check_given',
+                  'apartment_sale', 'invoice_amount', 'quantity', 'unit_price']
+
+TEXT_FIELDS = ['title', 'cash_owner', 'construction_group', 'company_name', 'description']
+
+# Yalnızca noktalarla üçerli gruplanmış sayı: "1.500", "12.345.678" (Türkçe binlik ayracı).
+# İlk grup 0 ile başlamaz; "0.125" binlik gösterimi olamaz, ondalık sayıdır.
+THOUSANDS_PATTERN = re.compile(r"[-+]?[1-9]\d{0,2}(\.\d{3})+")
+
+
+# decimal: None (otomatik, Türkçe öncelikli), 'comma' (1.234,56) veya 'point' (1,234.56)
+def parse_number(value, decimal=None):
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip().replace(' ', '')
+    if not text:
+        return 0
+
+    if decimal == 'comma':
+        text = text.replace('.', '').replace(',', '.')
+    elif decimal == 'point':
+        text = text.replace(',', '')
+    # "1.234,56" (Türkçe) ve "1,234.56" biçimlerinin ikisi de kabul edilir
+    elif ',' in text and '.' in text:
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        text = text.replace(',', '.')
+    # Virgülsüz "1.500" Türkçede bin beş yüzdür; nokta ondalıklı dosyalar (1.125 gibi
+    # üç basamaklı kesirler) decimal='point' ile okunmalıdır
+    elif THOUSANDS_PATTERN.fullmatch(text):
+        text = text.replace('.', '')
+    return float(text)
+
+
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+
+    text = str(value or '').strip()
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Geçersiz tarih: {text}")
+
+
+def read_csv_rows(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def read_xlsx_rows(path):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_records(rows, decimal=None):
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    columns = [COLUMN_MAP.get(str(name).strip()) if name is not None else None for name in header]
+    if 'date' not in columns:
+        raise Exception("Dosyada 'Tarih' sütunu bulunamadı.")
+
+    for line, row in enumerate(rows, 2):
+        if not any(value not in (None, '') for value in row):
+            continue
+
+        values = {}
+        for key, value in zip(columns, row):
+            if key:
+                values[key] = value
+
+        try:
+            record = {'date': parse_date(values.get('date'))}
+            for field in TEXT_FIELDS:
+                value = values.get(field)
+                record[field] = str(value).strip() if value not in (None, '') else None
+            for field in NUMERIC_FIELDS:
+                record[field] = parse_number(values.get(field), decimal)
+        except ValueError as e:
+            raise Exception(f"{line}. satır okunamadı: {e}")
+
+        yield record
+
+
+def import_file(database, path, decimal=None):
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        rows = read_csv_rows(path)
+    elif suffix in ('.xlsx', '.xlsm'):
+        rows = read_xlsx_rows(path)
+    else:
+        raise Exception(f"Desteklenmeyen dosya türü: {path.suffix}")
+
+    return database.add_transactions_bulk(iter_records(rows, decimal))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/XLSX dosyalarından işlem içe aktarır.")
+    parser.add_argument("files", nargs="+", help="İçe aktarılacak .csv veya .xlsx dosyaları")
+    parser.add_argument("--decimal", choices=["comma", "point"],
+                        help="Ondalık ayracı (varsayılan: otomatik; virgülsüz 1.500 binlik sayılır)")
+    args = parser.parse_args(argv)
+
+    from database import Database
+    database = Database()
+
+    for file in args.files:
+        try:
+            count = import_file(database, file, args.decimal)
+        except Exception as e:
+            print(f"{file}: {e}", file=sys.stderr)
+            return 1
+        print(f"{file}: {count} işlem içe aktarıldı")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+# Sorgu ölçümü ortam değişkenleriyle açılır:
+#   MUHASEBE_QUERY_LOG=1 veya dosya yolu  her ifadenin süresini ve satır sayısını
+#                                          dönen günlüğe yazar (varsayılan depodaki database/sorgu.log)
+#   MUHASEBE_SLOW_QUERY_MS=100            bu süreyi aşan ifadeler yavaş sayılır
+#   MUHASEBE_QUERY_PLAN=1                 yavaş SELECT'lerin EXPLAIN QUERY PLAN çıktısı da yazılır
+# Kapalıyken bağlantılar düz sqlite3.Connection'dır; ek maliyet yoktur.
+LOG_SETTING = os.environ.get("MUHASEBE_QUERY_LOG", "")
+ENABLED = LOG_SETTING not in ("", "0")
+# Varsayılan yol çalışma dizininden bağımsızdır (SCHEMA_PATH gibi depoya göre)
+DEFAULT_LOG_PATH = Path(__file__).resolve().parent.parent / "database" / "sorgu.log"
+LOG_PATH = Path(LOG_SETTING) if LOG_SETTING not in ("", "0", "1") else DEFAULT_LOG_PATH
+SLOW_QUERY_MS = float(os.environ.get("MUHASEBE_SLOW_QUERY_MS", "100"))
+CAPTURE_PLAN = os.environ.get("MUHASEBE_QUERY_PLAN", "") not in ("", "0")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+logger = logging.getLogger("muhasebe.sql")
+
+
+def setup_logging():
+    if logger.handlers:
+        return
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                  encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(levelname)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def normalize(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+class QueryStats:
+    # İfade metnine göre toplanmış istatistikler (tüm iş parçacıkları için ortak)
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def record(self, sql, seconds, rows, slow, failed):
+        with self.lock:
+            entry = self.entries.get(sql)
+            if entry is None:
+                entry = self.entries[sql] = {'sql': sql, 'count': 0, 'total': 0.0, 'max': 0.0,
+                                             'rows': 0, 'slow': 0, 'errors': 0}
+            entry['count'] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            entry['rows'] += rows
+            entry['slow'] += 1 if slow else 0
+            entry['errors'] += 1 if failed else 0
+
+    def snapshot(self):
+        # Toplam süreye göre azalan sırada kopyalar
+        with self.lock:
+            entries = [dict(entry) for entry in self.entries.values()]
+        return sorted(entries, key=lambda entry: entry['total'], reverse=True)
+
+    def reset(self):
+        with self.lock:
+            self.entries.clear()
+
+
+stats = QueryStats()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    # execute ile başlayan ifadenin süresine sonraki fetch çağrıları da eklenir;
+    # ifade, satırlar tükenince veya imleç yeniden kullanılınca kaydedilir
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.statement = None
+
+    def begin(self, sql, parameters):
+        self.finish()
+        self.statement = [sql, parameters, 0.0, 0]
+
+    def finish(self, failed=False):
+        if self.statement is None:
+            return
+        sql, parameters, seconds, rows = self.statement
+        self.statement = None
+        if rows == 0 and self.rowcount > 0:
+            rows = self.rowcount  # INSERT/UPDATE/DELETE
+        report(self.connection, sql, parameters, seconds, rows, failed)
+
+    def timed(self, function, *args):
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        except sqlite3.Error:
+            if self.statement is not None:
+                self.statement[2] += time.perf_counter() - start
+                self.finish(failed=True)
+            raise
+        finally:
+            if self.statement is not None:
+                self.statement[2] += time.perf_counter() - start
+
+    def execute(self, sql, parameters=()):
+        self.begin(sql, parameters)
+        self.timed(super().execute, sql, parameters)
+        if self.description is None:
+            self.finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self.begin(sql, None)
+        self.timed(super().executemany, sql, seq_of_parameters)
+        self.finish()
+        return self
+
+    def fetchone(self):
+        row = self.timed(super().fetchone)
+        self.add_rows(1 if row is not None else 0, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self.timed(super().fetchmany, size or self.arraysize)
+        self.add_rows(len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.timed(super().fetchall)
+        self.add_rows(len(rows), True)
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def add_rows(self, count, exhausted):
+        if self.statement is not None:
+            self.statement[3] += count
+            if exhausted:
+                self.finish()
+
+    def close(self):
+        self.finish()
+        super().close()
+
+    def __del__(self):
+        # fetchone ile tek satır okunup bırakılan imleçler
+        self.finish()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute kısayolları cursor() metodunu çağırmadığından ayrıca sarılır
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def report(connection, sql, parameters, seconds, rows, failed):
+    milliseconds = seconds * 1000
+    slow = milliseconds >= SLOW_QUERY_MS
+    text = normalize(sql)
+    stats.record(text, seconds, rows, slow, failed)
+
+    message = f"{milliseconds:9.1f} ms {rows:8d} satır  {text}"
+    if failed:
+        logger.warning("HATA %s", message)
+    elif slow:
+        logger.warning("YAVAŞ %s%s", message, query_plan(connection, sql, parameters))
+    else:
+        logger.info("%s", message)
+
+
+def query_plan(connection, sql, parameters):
+    if not CAPTURE_PLAN or not text_is_query(sql) or parameters is None:
+        return ""
+    try:
+        # Ölçülmeyen düz imleçle
+        cursor = sqlite3.Cursor(connection)
+        plan = cursor.execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error as e:
+        return f"\n    plan alınamadı: {e}"
+    return "".join(f"\n    {row[3]}" for row in plan)
+
+
+def text_is_query(sql):
+    return sql.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+def connection_factory():
+    # ConnectionManager bağlantıları bu sınıfla açar
+    if ENABLED:
+        setup_logging()
+        return InstrumentedConnection
+    return sqlite3.Connection
@@ -1,19 +1,48 @@
+import os
 import sys
+import time
+
+# MUHASEBE_STARTUP_TIMING=1 açılış aşamalarının sürelerini stderr'e yazar;
+# "exit" verilirse ilk veriler yüklendikten sonra uygulama kapanır (ölçüm betikleri için)
+STARTUP_TIMING = os.environ.get("MUHASEBE_STARTUP_TIMING")
+STARTED = time.perf_counter()
+
+
+def report_startup(phase):
+    if STARTUP_TIMING:
+        print(f"açılış: {phase} {(time.perf_counter() - STARTED) * 1000:.0f} ms", file=sys.stderr)
+
+
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
 from database import Database
 from ui.main_window import MainWindow
 
+report_startup("modüller yüklendi")
+
+
 def main():
     app = QApplication(sys.argv)
-    
-    # Veritabanı bağlantısını oluştur
-    db = Database()
-    
-    # Ana pencereyi oluştur ve göster
+
+    # Veritabanı bağlantısını oluştur; MUHASEBE_DB başka bir dosyayı açar (ör. ölçüm betikleri)
+    db = Database(os.environ["MUHASEBE_DB"]) if os.environ.get("MUHASEBE_DB") else Database()
+    report_startup("veritabanı açıldı")
+
+    # Ana pencereyi oluştur ve göster; veriler pencere açıldıktan sonra yüklenir
     window = MainWindow(db)
     window.show()
-    
+    report_startup("pencere gösterildi")
+
+    if STARTUP_TIMING:
+        def first_data():
+            window.model.modelReset.disconnect(first_data)
+            report_startup("ilk veriler yüklendi")
+            if STARTUP_TIMING == "exit":
+                QTimer.singleShot(0, window.close)
+
+        window.model.modelReset.connect(first_data)
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,59 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# İsteğe bağlı sorgu sonucu önbelleği: MUHASEBE_QUERY_CACHE=<satır sayısı> ile açılır
+# (ör. 50000). Kapalıyken (varsayılan) Database hiçbir sonucu saklamaz.
+# Önbellek yalnızca bu süreçte yapılan yazmaları bilir; veritabanına aynı anda
+# başka bir programdan (ör. cli.py import) yazılıyorsa açılmamalıdır.
+DEFAULT_MAX_ROWS = int(os.environ.get("MUHASEBE_QUERY_CACHE", "0") or 0)
+
+
+def cache_key(*parts):
+    # Filtre sözlüğünde anahtar sırası ve demet/liste ayrımı anahtarı değiştirmez
+    return json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class QueryCache:
+    # En son kullanılan sonuçlar; toplam satır sayısı max_rows'u aşınca en eski
+    # kullanılanlar atılır. Her kayıt yazıldığı andaki yazma sayacıyla (generation)
+    # tutulur, sayaç değiştiyse geçersizdir. Tüm iş parçacıkları için ortaktır.
+    def __init__(self, max_rows):
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, generation):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != generation:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, generation, value, size=1):
+        # size: sonucun satır sayısı; sınırdan büyük sonuçlar saklanmaz
+        if size > self.max_rows:
+            return
+        with self.lock:
+            self.discard(key)
+            self.entries[key] = (generation, value, size)
+            self.rows += size
+            while self.rows > self.max_rows:
+                self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.rows -= entry[2]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.rows = 0
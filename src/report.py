@@ -0,0 +1,298 @@
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from database import fold_turkish
+
+# openpyxl yalnızca rapor yazılırken yüklenir; bu modülü içe aktarmak
+# uygulamanın ve komut satırı aracının açılışını yavaşlatmaz
+
+HEADERS = ["Tarih", "Başlık", "Kasa Sahibi", "Firma", "Açıklama",
+           "Yapılan Ödeme", "Alınan Ödeme", "Alınan Çek", "Verilen Çek",
+           "Daire Satış", "Fatura Tutarı", "Miktar", "Birim Fiyat",
+           "Toplam Tutar"]
+
+# Sütun genişlikleri
+COLUMN_WIDTHS = {
+    'A': 15,  # Tarih
+    'B': 25,  # Başlık
+    'C': 25,  # Kasa Sahibi
+    'D': 25,  # Firma
+    'E': 40,  # Açıklama
+    'F': 15,  # Yapılan Ödeme
+    'G': 15,  # Alınan Ödeme
+    'H': 15,  # Alınan Çek
+    'I': 15,  # Verilen Çek
+    'J': 15,  # Daire Satış
+    'K': 15,  # Fatura Tutarı
+    'L': 12,  # Miktar
+    'M': 15,  # Birim Fiyat
+    'N': 15,  # Toplam Tutar
+}
+
+TEXT_FIELDS = ['date', 'title_name', 'cash_owner_name', 'company_name', 'description']
+NUMERIC_FIELDS = ['expense', 'payment_received', 'check_received', 'check_given',
+                  'apartment_sale', 'invoice_amount', 'quantity', 'unit_price']
+
+NUMBER_FORMAT = '#,##0.00'
+
+# Özet sayfaları: (sayfa adı, grup başlığı, Database.get_totals gruplaması)
+SUMMARY_SHEETS = [
+    ("Başlık Özeti", "Başlık", 'title'),
+    ("Kasa Sahibi Özeti", "Kasa Sahibi", 'cash_owner'),
+    ("İnşaat Grubu Özeti", "İnşaat Grubu", 'construction_group'),
+    ("Aylık Özet", "Ay", 'month'),
+]
+
+# Özet sayfalarının sütunları: (başlık, get_totals sütunu)
+SUMMARY_COLUMNS = [
+    ("İşlem Sayısı", 'transaction_count'),
+    ("Yapılan Ödeme", 'expense'),
+    ("Alınan Ödeme", 'payment_received'),
+    ("Alınan Çek", 'check_received'),
+    ("Verilen Çek", 'check_given'),
+    ("Daire Satış", 'apartment_sale'),
+    ("Fatura Tutarı", 'invoice_amount'),
+    ("Toplam Tutar", 'total_amount'),
+    ("Bakiye", 'balance'),
+]
+
+# write_excel_report ilerlemeyi bu kadar satırda bir bildirir
+PROGRESS_INTERVAL = 5000
+
+# Bölünmüş raporlarda parçalar: (Database.get_totals gruplaması → filtre anahtarı)
+SPLIT_FILTERS = {'title': 'title_id', 'cash_owner': 'cash_owner_id'}
+
+# Bölünmüş rapor klasöründe tüm filtrenin özet sayfalarını içeren dosya
+SUMMARY_FILE_NAME = "00_ozet.xlsx"
+
+
+def default_report_name(extension=".xlsx"):
+    # Bölünmüş raporlar için uzantısız verilir ve klasör adı olarak kullanılır
+    return f"muhasebe_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+
+
+def new_report_path(directory, extension=".xlsx"):
+    # Aynı saniyede oluşturulan raporlar birbirinin üzerine yazılmaz; _2, _3 ... eklenir
+    name = default_report_name("")
+    path = Path(directory) / f"{name}{extension}"
+    number = 2
+    while path.exists():
+        path = Path(directory) / f"{name}_{number}{extension}"
+        number += 1
+    return path
+
+
+def register_styles(wb):
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+
+    # Tüm hücreler bu paylaşılan adlandırılmış stilleri kullanır;
+    # hücre başına ayrı stil nesnesi oluşturulmaz.
+    thin_border = Side(border_style="thin", color="000000")
+    border = Border(left=thin_border, right=thin_border, top=thin_border, bottom=thin_border)
+    alternate_fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
+
+    header = NamedStyle(name='rapor_baslik')
+    header.font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
+    header.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+    header.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    header.border = border
+    wb.add_named_style(header)
+
+    # Metin ve sayı stilleri, alternatif satır renkli ve renksiz olarak
+    for suffix, fill in [('', None), ('_alt', alternate_fill)]:
+        text = NamedStyle(name='rapor_metin' + suffix)
+        text.alignment = Alignment(horizontal='left', vertical='center')
+        text.border = border
+
+        number = NamedStyle(name='rapor_sayi' + suffix)
+        number.alignment = Alignment(horizontal='right', vertical='center')
+        number.border = border
+        number.number_format = NUMBER_FORMAT
+
+        if fill is not None:
+            text.fill = fill
+            number.fill = fill
+
+        wb.add_named_style(text)
+        wb.add_named_style(number)
+
+
+def styled_cell(ws, value, style):
+    from openpyxl.cell import WriteOnlyCell
+
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+# Filtreye uyan işlemleri Excel dosyasına yazar ve yazılan satır sayısını döner.
+# Çalışma kitabı yalnızca-yazma kipinde oluşturulur ve satırlar
+# Database.iter_transactions ile parça parça okunur; bellek kullanımı satır sayısından bağımsızdır.
+# Kayıt yoksa dosya oluşturulmaz ve 0 döner. progress(satır sayısı) verilirse
+# PROGRESS_INTERVAL satırda bir çağrılır.
+def write_excel_report(database, filters, excel_path, progress=None):
+    rows = database.iter_transactions(filters)
+    first = next(rows, None)
+    if first is None:
+        return 0
+
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    register_styles(wb)
+    ws = wb.create_sheet("Muhasebe Raporu")
+
+    # Yalnızca-yazma kipinde boyutlar satırlardan önce ayarlanmalıdır
+    for col, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[col].width = width
+    ws.row_dimensions[1].height = 30
+
+    ws.append([styled_cell(ws, header, 'rapor_baslik') for header in HEADERS])
+
+    count = 0
+    for row, trans in enumerate(chain([first], rows), 2):
+        # Çift satırlar alternatif renkle boyanır
+        suffix = '_alt' if row % 2 == 0 else ''
+        text_style = 'rapor_metin' + suffix
+        number_style = 'rapor_sayi' + suffix
+
+        cells = [styled_cell(ws, trans[field], text_style) for field in TEXT_FIELDS]
+        cells.extend(styled_cell(ws, trans[field] or 0, number_style) for field in NUMERIC_FIELDS)
+
+        # Toplam Tutar veritabanında saklanır; formül yazılmadığından Excel açılışta yeniden hesaplamaz
+        cells.append(styled_cell(ws, trans['total_amount'] or 0, number_style))
+
+        ws.append(cells)
+        count += 1
+        if progress is not None and count % PROGRESS_INTERVAL == 0:
+            progress(count)
+
+    write_summary_sheets(wb, database, filters)
+    wb.save(excel_path)
+    return count
+
+
+# Yalnızca özet sayfalarından oluşan rapor; filtreye uyan işlem sayısını döner
+def write_summary_report(database, filters, excel_path):
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    register_styles(wb)
+    total = write_summary_sheets(wb, database, filters)
+    if not total['transaction_count']:
+        return 0
+    wb.save(excel_path)
+    return total['transaction_count']
+
+
+def write_summary_sheets(wb, database, filters):
+    # Özetler veritabanında GROUP BY ile hesaplanır; sayfalarda formül bulunmaz
+    total = database.get_totals(filters=filters)[0]
+    for title, group_header, group_by in SUMMARY_SHEETS:
+        write_summary_sheet(wb, title, group_header, database.get_totals(group_by, filters), total)
+    return total
+
+
+def write_summary_sheet(wb, title, group_header, rows, total):
+    from openpyxl.utils import get_column_letter
+
+    ws = wb.create_sheet(title)
+    ws.column_dimensions['A'].width = 30
+    for col in range(2, len(SUMMARY_COLUMNS) + 2):
+        ws.column_dimensions[get_column_letter(col)].width = 18
+    ws.row_dimensions[1].height = 30
+
+    headers = [group_header] + [header for header, _ in SUMMARY_COLUMNS]
+    ws.append([styled_cell(ws, header, 'rapor_baslik') for header in headers])
+
+    for row, values in enumerate(rows, 2):
+        suffix = '_alt' if row % 2 == 0 else ''
+        cells = [styled_cell(ws, values['name'] or "(Belirtilmemiş)", 'rapor_metin' + suffix)]
+        cells.extend(styled_cell(ws, values[key], 'rapor_sayi' + suffix) for _, key in SUMMARY_COLUMNS)
+        ws.append(cells)
+
+    # Genel toplam satırı
+    cells = [styled_cell(ws, "Toplam", 'rapor_baslik')]
+    cells.extend(styled_cell(ws, total[key], 'rapor_sayi') for _, key in SUMMARY_COLUMNS)
+    ws.append(cells)
+
+
+# Bölünmüş rapor parçaları: (ad, parça filtresi, satır sayısı), ada göre sıralı
+def report_parts(database, filters, split_by, conn=None):
+    if split_by not in SPLIT_FILTERS:
+        raise Exception(f"Geçersiz bölme: {split_by}")
+    key = SPLIT_FILTERS[split_by]
+    return [(row['name'] or "(Belirtilmemiş)", dict(filters or {}, **{key: row['group_id']}),
+             row['transaction_count'])
+            for row in database.get_totals(split_by, filters, conn)]
+
+
+def part_file_name(name):
+    # Dosya adlarında geçersiz karakterler alt çizgiyle değiştirilir
+    return (re.sub(r'[\\/:*?"<>|]+', '_', name).strip(' .') or "_") + ".xlsx"
+
+
+def part_file_names(parts):
+    # report_parts sırasıyla parça başına benzersiz dosya adları. Windows'ta dosya
+    # adlarında büyük/küçük harf ayırt edilmez; yalnızca harf büyüklüğüyle ayrılan
+    # başlıklar ("İnova"/"inova"), "(Belirtilmemiş)" adlı bir başlık ile başlıksız
+    # işlemler veya özet dosyasıyla aynı ada düşen parçalar numaralandırılır
+    # ("inova_2.xlsx"); aksi halde paralel yazılırken birbirinin üzerine yazarlardı.
+    def key(file_name):
+        return fold_turkish(file_name).casefold()
+
+    used = {key(SUMMARY_FILE_NAME)}
+    names = []
+    for name, _, _ in parts:
+        file_name = part_file_name(name)
+        stem, number = file_name[:-len(".xlsx")], 2
+        while key(file_name) in used:
+            file_name = f"{stem}_{number}.xlsx"
+            number += 1
+        used.add(key(file_name))
+        names.append(file_name)
+    return names
+
+
+def write_report_part(db_path, filters, excel_path):
+    # Süreç havuzunda çalışır; her süreç kendi veritabanı bağlantılarını açar
+    from database import Database
+    from report_cache import cached_report
+
+    database = Database(db_path)
+    try:
+        return cached_report(database, 'xlsx', filters, excel_path,
+                             lambda path: write_excel_report(database, filters, path))
+    finally:
+        database.connections.close()
+
+
+# Filtreye uyan işlemleri başlık veya kasa sahibi başına ayrı dosyalara yazar.
+# Parçalar ProcessPoolExecutor ile tüm işlemcilerde paralel yazılır (jobs=None ise
+# işlemci sayısı kadar süreç); klasöre ayrıca tüm filtrenin özeti yazılır.
+# progress(biten parça, parça sayısı) her parça bittiğinde çağrılır. Yazılan
+# toplam satır sayısını döner.
+def write_split_reports(database, filters, split_by, output_dir, jobs=None, progress=None):
+    parts = report_parts(database, filters, split_by)
+    if not parts:
+        return 0
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(jobs) as executor:
+        futures = [executor.submit(write_report_part, str(database.db_path), part_filters,
+                                   str(output_dir / file_name))
+                   for (_, part_filters, _), file_name in zip(parts, part_file_names(parts))]
+        # Özet bu süreçte, parçalar yazılırken hazırlanır
+        from report_cache import cached_report
+        cached_report(database, 'summary', filters, output_dir / SUMMARY_FILE_NAME,
+                      lambda path: write_summary_report(database, filters, path))
+
+        count = 0
+        for done, future in enumerate(as_completed(futures), 1):
+            count += future.result()
+            if progress is not None:
+                progress(done, len(futures))
+    return count
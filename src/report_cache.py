@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+# Oluşturulan rapor dosyalarının önbelleği. Anahtar; rapor türü, filtre sözlüğü,
+# biçim seçenekleri, veritabanının veri sayacı (Database.data_revision) ile dosya yolu
+# ve kimliğidir (Database.data_identity). Veri değişmediyse aynı rapor yeniden
+# yazılmaz, önbellekteki dosya kopyalanır. Önbellek veritabanının yanındaki klasörde
+# tutulur ve klasördeki tüm veritabanlarınca paylaşılır; MUHASEBE_REPORT_CACHE=0 kapatır.
+ENABLED = os.environ.get("MUHASEBE_REPORT_CACHE", "") != "0"
+CACHE_DIR_NAME = "rapor_onbellek"
+
+# Bu süreden eski veya toplam boyut sınırını aşan dosyalar (en az kullanılan önce) silinir
+MAX_AGE_DAYS = 7
+MAX_BYTES = 500 * 1024 * 1024
+
+
+class ReportCache:
+    def __init__(self, directory, max_age_days=MAX_AGE_DAYS, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_age = max_age_days * 24 * 3600
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def for_database(cls, database):
+        return cls(database.db_path.parent / CACHE_DIR_NAME)
+
+    def key(self, source, revision, kind, filters, options=None):
+        # source: veritabanını ayırt eden değerler (yol, kimlik). Demet/liste ayrımı ve
+        # anahtar sırası anahtarı değiştirmez.
+        text = json.dumps([source, revision, kind, filters or {}, options or {}], sort_keys=True,
+                          ensure_ascii=False)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+    def entry(self, key):
+        # Önbellekteki dosya adı: <anahtar>-<satır sayısı><uzantı>
+        for path in self.directory.glob(f"{key}-*"):
+            if path.suffix != ".tmp":
+                return path
+        return None
+
+    def fetch(self, key, output_path):
+        # Dosya varsa çıktıya kopyalanır ve satır sayısı döner; yoksa None
+        path = self.entry(key)
+        try:
+            if path is None or time.time() - path.stat().st_mtime > self.max_age:
+                return None
+            shutil.copyfile(path, output_path)
+            path.touch()  # Son kullanım zamanı
+        except FileNotFoundError:
+            return None  # Başka bir süreç bu arada sildi
+        return int(path.stem.rsplit("-", 1)[1])
+
+    def store(self, key, output_path, count):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        output_path = Path(output_path)
+        path = self.directory / f"{key}-{count}{output_path.suffix}"
+        # Yarım kopya okunmasın diye geçici adla yazılıp yeniden adlandırılır
+        temporary = path.with_name(path.name + ".tmp")
+        shutil.copyfile(output_path, temporary)
+        os.replace(temporary, path)
+        self.evict()
+
+    def evict(self):
+        now = time.time()
+        entries = []
+        for path in self.directory.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Başka bir süreç sildi
+            if path.suffix == ".tmp":
+                # Yazılmakta olan kopya; yarıda kesilmiş süreçlerden kalanlar bir saat sonra silinir
+                if now - stat.st_mtime > 3600:
+                    path.unlink(missing_ok=True)
+            elif now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        # En son kullanılanlar tutulur
+        total = 0
+        for _, size, path in sorted(entries, reverse=True):
+            total += size
+            if total > self.max_bytes:
+                path.unlink(missing_ok=True)
+
+    def clear(self):
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+
+
+# write(output_path) ile yazılan raporu önbellekten verir veya yazıp önbelleğe ekler.
+# Satır sayısını döner; 0 dönen (kayıtsız) raporlar önbelleğe alınmaz.
+def cached_report(database, kind, filters, output_path, write, options=None):
+    if not ENABLED:
+        return write(output_path)
+
+    cache = ReportCache.for_database(database)
+    source = [str(database.db_path.resolve()), database.data_identity()]
+    key = cache.key(source, database.data_revision(), kind, filters, options)
+    count = cache.fetch(key, output_path)
+    if count is not None:
+        return count
+
+    count = write(output_path)
+    if count:
+        cache.store(key, output_path, count)
+    return count
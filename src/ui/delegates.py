@@ -0,0 +1,9 @@
+from PySide6.QtWidgets import QStyledItemDelegate
+
+
+class AmountDelegate(QStyledItemDelegate):
+    # Modelden gelen ham sayıları çizim sırasında yerel ayara göre iki ondalıkla biçimlendirir
+    def displayText(self, value, locale):
+        if isinstance(value, (int, float)):
+            return locale.toString(float(value), 'f', 2)
+        return super().displayText(value, locale)
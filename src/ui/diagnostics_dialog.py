@@ -0,0 +1,81 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                              QTableWidget, QTableWidgetItem, QHeaderView)
+from PySide6.QtCore import Qt
+import instrumentation
+
+
+class DiagnosticsDialog(QDialog):
+    # Sorgu ölçümünün topladığı ifade istatistikleri (toplam süreye göre sıralı)
+    HEADERS = ["Sorgu", "Sayı", "Toplam (ms)", "Ortalama (ms)", "En Uzun (ms)",
+               "Satır", "Yavaş", "Hata"]
+
+    def __init__(self, database, parent=None):
+        super().__init__(parent)
+        self.database = database
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        self.setWindowTitle("Tanılama")
+        self.resize(1100, 500)
+        layout = QVBoxLayout(self)
+
+        if instrumentation.ENABLED:
+            status = (f"Sorgu günlüğü: {instrumentation.LOG_PATH} — "
+                      f"{instrumentation.SLOW_QUERY_MS:g} ms üzerindeki sorgular yavaş sayılır"
+                      f"{' (sorgu planları kaydediliyor)' if instrumentation.CAPTURE_PLAN else ''}")
+        else:
+            status = ("Sorgu ölçümü kapalı. Açmak için uygulamayı MUHASEBE_QUERY_LOG=1 "
+                      "ortam değişkeniyle başlatın.")
+        layout.addWidget(QLabel(status))
+        self.cache_label = QLabel()
+        layout.addWidget(self.cache_label)
+
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        btn_refresh = QPushButton("Yenile")
+        btn_reset = QPushButton("Sıfırla")
+        btn_close = QPushButton("Kapat")
+        btn_refresh.clicked.connect(self.refresh)
+        btn_reset.clicked.connect(self.reset)
+        btn_close.clicked.connect(self.accept)
+        button_layout.addWidget(btn_refresh)
+        button_layout.addWidget(btn_reset)
+        button_layout.addStretch()
+        button_layout.addWidget(btn_close)
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        cache = self.database.query_cache
+        if cache is not None:
+            self.cache_label.setText(f"Sorgu önbelleği: {cache.hits} isabet, {cache.misses} ıska, "
+                                     f"{len(cache.entries)} sonuç / {cache.rows} satır "
+                                     f"(sınır {cache.max_rows} satır)")
+        else:
+            self.cache_label.setText("Sorgu önbelleği kapalı. Açmak için MUHASEBE_QUERY_CACHE=<satır sayısı> "
+                                     "ortam değişkenini kullanın.")
+
+        entries = instrumentation.stats.snapshot()
+        self.table.setRowCount(len(entries))
+        for row, entry in enumerate(entries):
+            sql_item = QTableWidgetItem(entry['sql'])
+            sql_item.setToolTip(entry['sql'])
+            self.table.setItem(row, 0, sql_item)
+
+            values = [entry['count'], entry['total'] * 1000, entry['total'] * 1000 / entry['count'],
+                      entry['max'] * 1000, entry['rows'], entry['slow'], entry['errors']]
+            for col, value in enumerate(values, 1):
+                text = f"{value:,.1f}" if isinstance(value, float) else str(value)
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def reset(self):
+        instrumentation.stats.reset()
+        self.refresh()
@@ -0,0 +1,67 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class ImportSignals(QObject):
+    finished = Signal(int)  # içe aktarılan işlem sayısı
+    failed = Signal(str)
+
+
+class ImportTask(QRunnable):
+    # Dosyayı iş parçacığında kendi yazma bağlantısıyla içe aktarır. GUI'nin bağlantısı
+    # oluşturulduğu iş parçacığına bağlı olduğundan veritabanı ayrıca açılır; ad
+    # önbellekleri eklenen adları PRAGMA data_version ile fark eder.
+    def __init__(self, db_path, path, signals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.db_path = db_path
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        from database import Database
+        from importer import import_file
+
+        try:
+            database = Database(self.db_path, query_cache_rows=0)
+            try:
+                count = import_file(database, self.path)
+            finally:
+                database.connections.close()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(count)
+
+
+class ImportRunner(QObject):
+    # Tek seferde bir içe aktarma çalıştırır
+    finished = Signal(int)
+    failed = Signal(str)
+
+    def __init__(self, database, parent=None):
+        super().__init__(parent)
+        self.database = database
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.task = None
+        self.signals = ImportSignals(self)
+        self.signals.finished.connect(self.on_finished)
+        self.signals.failed.connect(self.on_failed)
+
+    def start(self, path):
+        self.task = ImportTask(self.database.db_path, path, self.signals)
+        self.pool.start(self.task)
+
+    def shutdown(self):
+        # Yarıda kesilen içe aktarma geri alınacağından bitmesi beklenir
+        self.pool.waitForDone()
+
+    def on_finished(self, count):
+        self.task = None
+        # Yazma bu Database nesnesinin dışında yapıldı; sorgu önbelleği ve ad listeleri yenilenir
+        self.database.external_write()
+        self.finished.emit(count)
+
+    def on_failed(self, message):
+        self.task = None
+        self.failed.emit(message)
@@ -0,0 +1,75 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# Veritabanı başına paylaşılan modeller: {database: {(tablo, tümü_etiketi): model}}
+_models = {}
+
+
+class LookupListModel(QAbstractListModel):
+    # Combobox'lar için ad listesi; veriler Database önbelleğinden okunur.
+    # Qt.UserRole kaydın id'sini döner ("Tümü" satırı için None).
+    def __init__(self, database, table, all_label=None):
+        super().__init__()
+        self.database = database
+        self.table = table
+        self.all_label = all_label
+        self.rows = database.lookup(table).rows
+
+    def reload(self, table):
+        if table != self.table:
+            return
+        # Sıfırlama (reset) yerine satır ekleme/silme sinyalleri: reset modeli paylaşan
+        # her combobox'ın seçimini ilk satıra ("Tümü") döndürürdü
+        rows = self.database.lookup(self.table).rows
+        offset = 1 if self.all_label else 0
+
+        ids = {row['id'] for row in rows}
+        for position in reversed(range(len(self.rows))):
+            if self.rows[position]['id'] not in ids:
+                self.beginRemoveRows(QModelIndex(), position + offset, position + offset)
+                self.rows = self.rows[:position] + self.rows[position + 1:]
+                self.endRemoveRows()
+
+        # Her iki liste de id sırasındadır; yeni kayıtlar yerlerine eklenir
+        ids = {row['id'] for row in self.rows}
+        for position, row in enumerate(rows):
+            if row['id'] not in ids:
+                self.beginInsertRows(QModelIndex(), position + offset, position + offset)
+                self.rows = self.rows[:position] + [row] + self.rows[position:]
+                self.endInsertRows()
+
+        renamed = [position for position, (old, new) in enumerate(zip(self.rows, rows))
+                   if old['name'] != new['name']]
+        self.rows = rows
+        if renamed:
+            self.dataChanged.emit(self.index(renamed[0] + offset), self.index(renamed[-1] + offset))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows) + (1 if self.all_label else 0)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if self.all_label:
+            if row == 0:
+                return self.all_label if role == Qt.DisplayRole else None
+            row -= 1
+
+        if role == Qt.DisplayRole:
+            return self.rows[row]['name']
+        if role == Qt.UserRole:
+            return self.rows[row]['id']
+        return None
+
+
+def lookup_model(database, table, all_label=None):
+    models = _models.setdefault(database, {})
+    key = (table, all_label)
+    if key not in models:
+        model = LookupListModel(database, table, all_label)
+        database.add_lookup_listener(model.reload)
+        models[key] = model
+    return models[key]
@@ -1,16 +1,23 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                              QTableWidget, QTableWidgetItem, QDialog, QMenu, QMessageBox,
-                              QLabel, QDateEdit, QComboBox, QFrame, QHeaderView)
-from PySide6.QtCore import Qt, QPoint, QDate
+                              QTableView, QTableWidget, QTableWidgetItem, QDialog, QMenu, QMessageBox,
+                              QLabel, QDateEdit, QComboBox, QFrame, QHeaderView, QFileDialog,
+                              QProgressBar, QLineEdit)
+from PySide6.QtCore import Qt, QPoint, QDate, QTimer
 from PySide6.QtGui import QFont, QColor, QPalette
 from .transaction_dialog import TransactionDialog
 from .title_dialog import TitleDialog
-from .report_dialog import ReportDialog
+from .transaction_model import TransactionTableModel, COLUMNS
+from .delegates import AmountDelegate
+from .lookup_models import lookup_model
+from .query_worker import QueryRunner
+from .import_worker import ImportRunner
 
 class MainWindow(QMainWindow):
     def __init__(self, database):
         super().__init__()
         self.database = database
+        # Rapor penceresi modsuz açılır; rapor yazılırken ana pencere kullanılabilir
+        self.report_dialog = None
         
         # Filtreleme widget'larını başlangıçta oluştur
         self.start_date = QDateEdit()
@@ -24,17 +31,24 @@ class MainWindow(QMainWindow):
         
         self.filter_title = QComboBox()
         self.filter_cash_owner = QComboBox()
+
+        # Firma adı ve açıklamada tam metin arama
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Firma veya açıklamada ara...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.returnPressed.connect(self.apply_filters)
+        self.last_search = ''
         
-        # Filtreleme combobox'larını doldur
-        self.refresh_filter_titles()
-        self.refresh_filter_cash_owners()
+        # Filtreleme combobox'ları ortak önbellek modellerini kullanır
+        self.filter_title.setModel(lookup_model(self.database, 'titles', "Tümü"))
+        self.filter_cash_owner.setModel(lookup_model(self.database, 'cash_owners', "Tümü"))
         
         self.setup_styles()  # Stil ayarlarını uygula
         self.setup_ui()
         self.setup_context_menu()
         
-        # Başlangıçta tüm verileri göster
-        self.refresh_table()
+        # Veriler pencere gösterildikten sonra arka planda yüklenir
+        QTimer.singleShot(0, self.refresh_table)
 
     def setup_ui(self):
         self.setWindowTitle("Muhasebe Programı")
@@ -54,14 +68,18 @@ class MainWindow(QMainWindow):
         btn_new_transaction = QPushButton("Yeni İşlem")
         btn_new_title = QPushButton("Yeni Başlık")
         btn_report = QPushButton("Raporla")
+        btn_import = self.btn_import = QPushButton("İçe Aktar")
+        btn_diagnostics = QPushButton("Tanılama")
 
-        for btn in [btn_new_transaction, btn_new_title, btn_report]:
+        for btn in [btn_new_transaction, btn_new_title, btn_report, btn_import, btn_diagnostics]:
             button_layout.addWidget(btn)
             btn.setMinimumHeight(35)
 
         btn_new_transaction.clicked.connect(self.show_transaction_dialog)
         btn_new_title.clicked.connect(self.show_title_dialog)
         btn_report.clicked.connect(self.show_report_dialog)
+        btn_import.clicked.connect(self.import_transactions)
+        btn_diagnostics.clicked.connect(self.show_diagnostics_dialog)
         
         button_layout.addStretch()
         layout.addWidget(button_frame)
@@ -98,6 +116,10 @@ class MainWindow(QMainWindow):
             filter_layout.addWidget(label)
             filter_layout.addWidget(combo)
 
+        search_label = QLabel("Ara:")
+        filter_layout.addWidget(search_label)
+        filter_layout.addWidget(self.search_edit)
+
         # Filtre butonları
         btn_filter = QPushButton("Filtrele")
         btn_clear_filters = QPushButton("Filtreleri Temizle")
@@ -111,17 +133,14 @@ class MainWindow(QMainWindow):
         layout.addWidget(filter_frame)
 
         # Tablo oluşturma ve temel ayarlar
-        self.table = QTableWidget()
-        
-        # Tablo başlıklarını tanımla
-        headers = [
-            "Tarih", "Başlık", "Kasa Sahibi", "İnşaat Grubu", "Firma", "Açıklama", 
-            "Yapılan Ödeme", "Alınan Ödeme", "Alınan Çek", "Verilen Çek", 
-            "Daire Satış", "Fatura Tutarı", "Miktar", "Birim Fiyatı", "Toplam Tutar"
-        ]
-        
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
+        self.table = QTableView()
+        # Filtre ve sıralama sorguları arka planda çalışır
+        self.query_runner = QueryRunner(self.database, self)
+        self.query_runner.busy_changed.connect(self.set_busy)
+        self.query_runner.failed.connect(self.show_query_error)
+        self.model = TransactionTableModel(self.database, self, self.query_runner)
+        self.model.modelReset.connect(self.refresh_summary)
+        self.table.setModel(self.model)
 
         # Başlık ve satır numarası ayarları
         header = self.table.horizontalHeader()
@@ -138,12 +157,17 @@ class MainWindow(QMainWindow):
         vertical_header.setVisible(True)
         vertical_header.setMinimumWidth(50)
         vertical_header.setDefaultSectionSize(35)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
         vertical_header.setFont(QFont("Arial", 10))
 
         # Tablo genel ayarları
         self.table.setShowGrid(True)
         self.table.setGridStyle(Qt.SolidLine)
         self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+
+        # Varsayılan sıralama: tarihe göre azalan
+        header.setSortIndicator(0, Qt.DescendingOrder)
         self.table.setSortingEnabled(True)
 
         # Sütun genişlikleri
@@ -168,21 +192,107 @@ class MainWindow(QMainWindow):
         for col, width in column_widths.items():
             self.table.setColumnWidth(col, width)
 
+        # Tutar sütunları ham değer taşır; yerel ayara göre çizim sırasında biçimlendirilir
+        self.amount_delegate = AmountDelegate(self.table)
+        for col, (_, _, numeric) in enumerate(COLUMNS):
+            if numeric:
+                self.table.setItemDelegateForColumn(col, self.amount_delegate)
+
         layout.addWidget(self.table)
 
-    def refresh_filter_titles(self):
-        self.filter_title.clear()
-        self.filter_title.addItem("Tümü", None)
-        titles = self.database.get_titles()
-        for title in titles:
-            self.filter_title.addItem(title['name'], title['id'])
+        # Filtrelenmiş işlemlerin toplamları; dizinli SQL toplam sorgusuyla arka planda hesaplanır
+        self.totals_runner = QueryRunner(self.database, self)
+        # Toplamların ve özetin hesaplandığı (filtreler, veri sayacı); sıralama gibi
+        # yalnızca sırayı değiştiren yenilemelerde yeniden hesaplanmaz
+        self.summary_state = None
+        self.totals_label = QLabel()
+        self.totals_label.setFont(QFont("Arial", 10))
+        layout.addWidget(self.totals_label)
+
+        # Kasa özeti paneli (tetikleyicilerle güncel tutulan özet tablosundan)
+        summary_label = QLabel("Kasa Özeti (tüm tarihler)")
+        summary_label.setFont(QFont("Arial", 10, QFont.Bold))
+        layout.addWidget(summary_label)
+
+        summary_headers = ["Kasa Sahibi", "İşlem Sayısı", "Alınan Ödeme", "Yapılan Ödeme",
+                           "Alınan Çek", "Verilen Çek", "Bakiye"]
+        self.summary_table = QTableWidget(0, len(summary_headers))
+        self.summary_table.setHorizontalHeaderLabels(summary_headers)
+        self.summary_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.summary_table.setMaximumHeight(160)
+        self.summary_table.verticalHeader().setVisible(False)
+        self.summary_table.horizontalHeader().setDefaultSectionSize(150)
+        self.summary_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.summary_table)
+
+        # İçe aktarma arka planda çalışır; tablo bitince mevcut filtre ve sıralamayla yenilenir
+        self.import_runner = ImportRunner(self.database, self)
+        self.import_runner.finished.connect(self.on_import_finished)
+        self.import_runner.failed.connect(self.on_import_failed)
+
+        # Sorgu sürerken gösterilen meşguliyet göstergesi
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)
+        self.busy_indicator.setMaximumWidth(200)
+        self.busy_indicator.hide()
+        self.statusBar().addPermanentWidget(self.busy_indicator)
+
+    def set_busy(self, busy):
+        self.busy_indicator.setVisible(busy)
+        if busy:
+            self.statusBar().showMessage("Veriler yükleniyor...")
+        else:
+            self.statusBar().clearMessage()
+
+    def show_query_error(self, message):
+        QMessageBox.critical(self, "Hata", f"Veriler okunurken bir hata oluştu:\n{message}")
+
+    def refresh_totals(self):
+        filters = self.model.filters
+
+        def compute(conn):
+            totals = dict(self.database.get_totals(filters=filters, conn=conn)[0])
+            return totals['transaction_count'], totals
+
+        self.totals_label.setText("Toplamlar hesaplanıyor...")
+        self.totals_runner.run(compute, self.show_totals)
+
+    def show_totals(self, result):
+        count, totals = result
+        labels = [("Yapılan Ödeme", 'expense'), ("Alınan Ödeme", 'payment_received'),
+                  ("Alınan Çek", 'check_received'), ("Verilen Çek", 'check_given'),
+                  ("Daire Satış", 'apartment_sale'), ("Fatura Tutarı", 'invoice_amount'),
+                  ("Toplam Tutar", 'total_amount')]
+        parts = [f"{count} işlem"] + [f"{label}: {totals[key]:,.2f}" for label, key in labels]
+        self.totals_label.setText("   |   ".join(parts))
+
+    def refresh_summary(self):
+        # Model her yenilendiğinde çağrılır; filtreler ve veriler değişmediyse (ör. sütun
+        # başlığıyla sıralama) toplamlar ve özet aynı kalır
+        state = (dict(self.model.filters), self.database.data_revision())
+        if state == self.summary_state:
+            return
+        self.summary_state = state
+
+        self.refresh_totals()
+
+        # Özet tarih filtresinden bağımsızdır; başlık ve kasa sahibi filtrelerine uyar
+        filters = {key: value for key, value in self.model.filters.items()
+                   if key in ('title_id', 'cash_owner_id')}
+        balances = self.database.get_balances(('cash_owner',), filters)
 
-    def refresh_filter_cash_owners(self):
-        self.filter_cash_owner.clear()
-        self.filter_cash_owner.addItem("Tümü", None)
-        cash_owners = self.database.get_cash_owners()
-        for owner in cash_owners:
-            self.filter_cash_owner.addItem(owner['name'], owner['id'])
+        self.summary_table.setRowCount(len(balances))
+        for row, balance in enumerate(balances):
+            name_item = QTableWidgetItem(balance['cash_owner_name'] or '')
+            self.summary_table.setItem(row, 0, name_item)
+
+            values = [balance['transaction_count'], balance['payment_received'], balance['expense'],
+                      balance['check_received'], balance['check_given'], balance['balance']]
+            for col, value in enumerate(values, 1):
+                text = str(value) if col == 1 else f"{value:,.2f}"
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.summary_table.setItem(row, col, item)
 
     def apply_filters(self):
         filters = {}
@@ -200,6 +310,15 @@ class MainWindow(QMainWindow):
         if self.filter_cash_owner.currentData():
             filters['cash_owner_id'] = self.filter_cash_owner.currentData()
 
+        # Arama filtresi; yeni bir aramada sonuçlar eşleşme derecesine göre sıralanır
+        search = self.search_edit.text().strip()
+        if search:
+            filters['search'] = search
+            if search != self.last_search:
+                self.table.horizontalHeader().setSortIndicator(-1, Qt.DescendingOrder)
+                self.model.order_by = None
+        self.last_search = search
+
         self.refresh_table(filters)
 
     def clear_filters(self):
@@ -211,78 +330,76 @@ class MainWindow(QMainWindow):
         # Comboboxları sıfırla
         self.filter_title.setCurrentIndex(0)
         self.filter_cash_owner.setCurrentIndex(0)
+        self.search_edit.clear()
+        self.last_search = ''
         
         # Tüm verileri göster
         self.refresh_table()
 
     def refresh_table(self, filters=None):
-        self.table.setSortingEnabled(False)  # Sıralamayı geçici olarak devre dışı bırak
-        
         if filters is None:
             filters = {}
-            
-        transactions = self.database.get_transactions(filters)
-        self.table.setRowCount(len(transactions))
-        
-        for row, trans in enumerate(transactions):
-            # İlk hücrede transaction ID'sini sakla
-            date_item = QTableWidgetItem(trans['date'])
-            date_item.setData(Qt.UserRole, trans['id'])
-            self.table.setItem(row, 0, date_item)
-
-            # Metin içeren hücreler
-            text_columns = {
-                1: trans['title_name'],
-                2: trans['cash_owner_name'],
-                3: trans['construction_group_name'],  # İnşaat grubu adı
-                4: trans['company_name'],
-                5: trans['description']
-            }
-            
-            for col, text in text_columns.items():
-                item = QTableWidgetItem(text or '')
-                item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                self.table.setItem(row, col, item)
-
-            # Sayısal değerleri formatlı göster
-            numeric_columns = {
-                6: trans['expense'],          # Yapılan Ödeme
-                7: trans['payment_received'], # Alınan Ödeme
-                8: trans['check_received'],   # Alınan Çek
-                9: trans['check_given'],      # Verilen Çek
-                10: trans['apartment_sale'],   # Daire Satış
-                11: trans['invoice_amount'],  # Fatura Tutarı
-                12: trans['quantity'],        # Miktar
-                13: trans['unit_price'],      # Birim Fiyatı
-                14: trans['quantity'] * trans['unit_price'] if trans['quantity'] and trans['unit_price'] else 0  # Toplam Tutar
-            }
-            
-            for col, value in numeric_columns.items():
-                item = QTableWidgetItem()
-                if value is not None:
-                    formatted_value = f"{value:,.2f}"
-                    item.setData(Qt.DisplayRole, formatted_value)
-                else:
-                    item.setData(Qt.DisplayRole, "0.00")
-                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, col, item)
 
-        self.table.setSortingEnabled(True)  # Sıralamayı tekrar etkinleştir
+        # Başka iş istasyonlarının eklediği başlık/kasa sahibi adları combobox'lara alınır
+        self.database.refresh_lookups()
+
+        # Satırlar model tarafından ihtiyaç duyuldukça sayfa sayfa okunur;
+        # özet paneli model yenilendiğinde güncellenir
+        self.model.set_filters(filters)
 
     def show_transaction_dialog(self):
+        self.database.refresh_lookups()
         dialog = TransactionDialog(self.database)
         if dialog.exec() == QDialog.Accepted:
-            self.refresh_table()
+            # Yalnızca eklenen satır, mevcut filtre ve sıralamaya göre yerleştirilir
+            self.model.add_transaction(dialog.saved_transaction)
+            self.refresh_summary()
 
     def show_title_dialog(self):
+        # Combobox'lar ortak modeller üzerinden kendiliğinden güncellenir
         dialog = TitleDialog(self.database)
-        if dialog.exec() == QDialog.Accepted:
-            self.refresh_table()
+        dialog.exec()
 
     def show_report_dialog(self):
-        dialog = ReportDialog(self.database)
+        # Rapor modülleri yalnızca ilk kullanımda yüklenir
+        from .report_dialog import ReportDialog
+
+        if self.report_dialog is None:
+            self.report_dialog = ReportDialog(self.database)
+        self.report_dialog.show()
+        self.report_dialog.raise_()
+        self.report_dialog.activateWindow()
+
+    def show_diagnostics_dialog(self):
+        from .diagnostics_dialog import DiagnosticsDialog
+
+        dialog = DiagnosticsDialog(self.database, self)
         dialog.exec()
 
+    def import_transactions(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "İşlemleri İçe Aktar", "", "Excel / CSV (*.xlsx *.csv)"
+        )
+        if not path:
+            return
+
+        self.btn_import.setEnabled(False)
+        self.btn_import.setText("İçe aktarılıyor...")
+        self.import_runner.start(path)
+
+    def on_import_finished(self, count):
+        self.reset_import_button()
+        self.refresh_table(self.model.filters)
+        QMessageBox.information(self, "Başarılı", f"{count} işlem içe aktarıldı.")
+
+    def on_import_failed(self, message):
+        self.reset_import_button()
+        QMessageBox.critical(self, "Hata", f"İçe aktarma sırasında bir hata oluştu:\n{message}")
+
+    def reset_import_button(self):
+        self.btn_import.setEnabled(True)
+        self.btn_import.setText("İçe Aktar")
+
     def setup_context_menu(self):
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
@@ -305,13 +422,18 @@ class MainWindow(QMainWindow):
             self.delete_transaction(row)
 
     def edit_transaction(self, row):
-        transaction_id = self.table.item(row, 0).data(Qt.UserRole)
+        transaction_id = self.model.transaction_id(row)
+        if not self.check_editable(transaction_id):
+            return
         dialog = TransactionDialog(self.database, transaction_id)
         if dialog.exec() == QDialog.Accepted:
-            self.refresh_table()
+            self.model.update_transaction(row, dialog.saved_transaction)
+            self.refresh_summary()
 
     def delete_transaction(self, row):
-        transaction_id = self.table.item(row, 0).data(Qt.UserRole)
+        transaction_id = self.model.transaction_id(row)
+        if not self.check_editable(transaction_id):
+            return
         reply = QMessageBox.question(
             self, 'İşlemi Sil',
             'Bu işlemi silmek istediğinizden emin misiniz?',
@@ -320,61 +442,23 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.Yes:
             self.database.delete_transaction(transaction_id)
-            self.refresh_table() 
-
-    def refresh_table(self, filters=None):
-        self.table.setSortingEnabled(False)  # Sıralamayı geçici olarak devre dışı bırak
-        
-        if filters is None:
-            filters = {}
-            
-        transactions = self.database.get_transactions(filters)
-        self.table.setRowCount(len(transactions))
-        
-        for row, trans in enumerate(transactions):
-            # İlk hücrede transaction ID'sini sakla
-            date_item = QTableWidgetItem(trans['date'])
-            date_item.setData(Qt.UserRole, trans['id'])
-            self.table.setItem(row, 0, date_item)
-
-            # Metin içeren hücreler
-            text_columns = {
-                1: trans['title_name'],
-                2: trans['cash_owner_name'],
-                3: trans['construction_group_name'],  # İnşaat grubu adı
-                4: trans['company_name'],
-                5: trans['description']
-            }
-            
-            for col, text in text_columns.items():
-                item = QTableWidgetItem(text or '')
-                item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                self.table.setItem(row, col, item)
-
-            # Sayısal değerleri formatlı göster
-            numeric_columns = {
-                6: trans['expense'],          # Yapılan Ödeme
-                7: trans['payment_received'], # Alınan Ödeme
-                8: trans['check_received'],   # Alınan Çek
-                9: trans['check_given'],      # Verilen Çek
-                10: trans['apartment_sale'],   # Daire Satış
-                11: trans['invoice_amount'],  # Fatura Tutarı
-                12: trans['quantity'],        # Miktar
-                13: trans['unit_price'],      # Birim Fiyatı
-                14: trans['quantity'] * trans['unit_price'] if trans['quantity'] and trans['unit_price'] else 0  # Toplam Tutar
-            }
-            
-            for col, value in numeric_columns.items():
-                item = QTableWidgetItem()
-                if value is not None:
-                    formatted_value = f"{value:,.2f}"
-                    item.setData(Qt.DisplayRole, formatted_value)
-                else:
-                    item.setData(Qt.DisplayRole, "0.00")
-                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, col, item)
-
-        self.table.setSortingEnabled(True)  # Sıralamayı tekrar etkinleştir 
+            self.model.remove_row(row)
+            self.refresh_summary()
+
+    def check_editable(self, transaction_id):
+        # Kapanmış dönemlerin işlemleri arşiv dosyalarındadır; yalnızca görüntülenir
+        if self.database.get_transaction(transaction_id) is None:
+            QMessageBox.warning(self, "Uyarı", "Bu işlem kapanmış bir döneme ait; düzenlenemez veya silinemez.")
+            return False
+        return True
+
+    def closeEvent(self, event):
+        if self.report_dialog is not None:
+            self.report_dialog.close()
+        self.query_runner.shutdown()
+        self.totals_runner.shutdown()
+        self.import_runner.shutdown()
+        super().closeEvent(event)
 
     def setup_styles(self):
         # Tüm stilleri kaldır
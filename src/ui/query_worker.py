@@ -0,0 +1,131 @@
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class QuerySignals(QObject):
+    # (istek numarası, sonuç) / (istek numarası, hata mesajı)
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+    # İş parçacığı görevi bıraktığında (iptal edilse bile) gönderilir
+    done = Signal(int)
+
+
+class Query(QRunnable):
+    # function(conn) iş parçacığının okuma bağlantısıyla çalıştırılır; dönen değer
+    # finished sinyaliyle GUI iş parçacığına iletilir
+    def __init__(self, database, request_id, function, signals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.database = database
+        self.request_id = request_id
+        self.function = function
+        self.signals = signals
+        self.conn = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        # Çalışmakta olan sorgu sqlite3.Connection.interrupt ile kesilir
+        with self.lock:
+            self.cancelled = True
+            if self.conn is not None:
+                self.conn.interrupt()
+
+    def run(self):
+        try:
+            # Havuz iş parçacıkları boşta kalınca sonlanır; bağlantı iş parçacığına değil
+            # göreve verilir ve görev bitince geri alınır
+            with self.database.connections.borrow_reader() as conn:
+                self.execute(conn)
+        finally:
+            self.signals.done.emit(self.request_id)
+
+    def execute(self, conn):
+        with self.lock:
+            if self.cancelled:
+                return
+            self.conn = conn
+
+        try:
+            result = self.function(self.conn)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(self.request_id, str(e))
+            return
+        finally:
+            # Bağlantı havuza geri verilip başka sorgularda kullanılır; bundan sonra
+            # gelen iptaller ona dokunmamalı
+            with self.lock:
+                self.conn = None
+
+        if not self.cancelled:
+            self.signals.finished.emit(self.request_id, result)
+
+
+class QueryRunner(QObject):
+    # Sorguları GUI iş parçacığı dışında çalıştırır. Yeni bir istek gelince
+    # önceki sorgu kesilir ve sonucu gelse bile kullanılmaz.
+    busy_changed = Signal(bool)
+    failed = Signal(str)
+
+    def __init__(self, database, parent=None):
+        super().__init__(parent)
+        self.database = database
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.request_id = 0
+        self.active = None
+        self.callback = None
+        # İş parçacığında çalışan görevler bitene kadar burada tutulur
+        self.running = {}
+        # Havuzdan sonra oluşturulur; kapanışta havuz iş parçacıklarını bekledikten
+        # sonra silinir
+        self.signals = QuerySignals(self)
+        self.signals.finished.connect(self.on_finished)
+        self.signals.failed.connect(self.on_failed)
+        self.signals.done.connect(self.on_done)
+
+    def submit(self, filters, order_by, limit, callback):
+        # Filtrelenmiş satır sayısı ve ilk sayfa; callback(filters, order_by, total, rows)
+        def load(conn):
+            total = self.database.count_transactions(filters, conn=conn)
+            rows = self.database.get_transactions(filters, limit=limit, order_by=order_by, conn=conn)
+            return filters, order_by, total, rows
+
+        self.run(load, lambda result: callback(*result))
+
+    def run(self, function, callback):
+        self.cancel()
+        self.request_id += 1
+        self.callback = callback
+        self.active = Query(self.database, self.request_id, function, self.signals)
+        self.running[self.request_id] = self.active
+        self.pool.start(self.active)
+        self.busy_changed.emit(True)
+
+    def cancel(self):
+        if self.active is not None:
+            self.active.cancel()
+            self.active = None
+            self.busy_changed.emit(False)
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.waitForDone()
+
+    def on_finished(self, request_id, result):
+        if request_id != self.request_id or self.active is None:
+            return  # Yerine yenisi gelmiş eski istek
+        self.active = None
+        self.busy_changed.emit(False)
+        self.callback(result)
+
+    def on_done(self, request_id):
+        self.running.pop(request_id, None)
+
+    def on_failed(self, request_id, message):
+        if request_id != self.request_id or self.active is None:
+            return
+        self.active = None
+        self.busy_changed.emit(False)
+        self.failed.emit(message)
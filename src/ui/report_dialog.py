@@ -1,14 +1,39 @@
-from PySide6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QComboBox,
-                              QPushButton, QMessageBox)
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox,
+                              QPushButton, QMessageBox, QProgressBar, QLabel, QCheckBox)
 from pathlib import Path
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from datetime import datetime
+from report import (new_report_path, report_parts, part_file_names, SUMMARY_FILE_NAME)
+from .lookup_models import lookup_model
+from .query_worker import QueryRunner
+from .report_runner import ReportRunner, ReportJob
+
+# Rapor dosyası seçenekleri: (etiket, report.SPLIT_FILTERS anahtarı)
+SPLIT_OPTIONS = [
+    ("Tek dosya", None),
+    ("Başlık başına dosya", 'title'),
+    ("Kasa sahibi başına dosya", 'cash_owner'),
+]
+
+# Çıktı biçimleri: (etiket, cli.py --format değeri, buton metni)
+FORMAT_OPTIONS = [
+    ("Excel (.xlsx)", 'xlsx', "Excel Raporu Oluştur"),
+    ("CSV (; ayraçlı)", 'csv', "CSV Dosyası Oluştur"),
+    ("TSV (sekme ayraçlı)", 'tsv', "TSV Dosyası Oluştur"),
+]
+
 
 class ReportDialog(QDialog):
+    # Rapor ayrı süreçlerde yazılır; pencere ve uygulama bu sırada kullanılabilir
     def __init__(self, database):
         super().__init__()
         self.database = database
+        self.output_path = None
+        # Satır sayıları ve parçalar arka planda okunur
+        self.query_runner = QueryRunner(database, self)
+        self.query_runner.failed.connect(self.on_failed)
+        self.report_runner = ReportRunner(database, self)
+        self.report_runner.progress.connect(self.on_progress)
+        self.report_runner.finished.connect(self.on_finished)
+        self.report_runner.failed.connect(self.on_failed)
         self.setup_ui()
 
     def setup_ui(self):
@@ -19,154 +44,148 @@ class ReportDialog(QDialog):
 
         # Başlık seçimi
         self.title_combo = QComboBox()
-        self.title_combo.addItem("Tümü", None)
-        self.refresh_titles()
+        self.title_combo.setModel(lookup_model(self.database, 'titles', "Tümü"))
         form.addRow("Başlık:", self.title_combo)
 
         # Kasa sahibi seçimi
         self.cash_owner_combo = QComboBox()
-        self.cash_owner_combo.addItem("Tümü", None)
-        self.refresh_cash_owners()
+        self.cash_owner_combo.setModel(lookup_model(self.database, 'cash_owners', "Tümü"))
         form.addRow("Kasa Sahibi:", self.cash_owner_combo)
 
-        layout.addLayout(form)
+        # Excel veya banka mutabakatı gibi araçlar için düz metin
+        self.format_combo = QComboBox()
+        for label, output_format, _ in FORMAT_OPTIONS:
+            self.format_combo.addItem(label, output_format)
+        form.addRow("Biçim:", self.format_combo)
+
+        # Tek dosya veya başlık/kasa sahibi başına paralel yazılan dosyalar (yalnızca Excel)
+        self.split_combo = QComboBox()
+        for label, split_by in SPLIT_OPTIONS:
+            self.split_combo.addItem(label, split_by)
+        form.addRow("Dosya:", self.split_combo)
+
+        # Düz metin seçenekleri
+        self.decimal_comma_check = QCheckBox("Ondalık virgül (1234,56)")
+        self.decimal_comma_check.setChecked(True)
+        self.bom_check = QCheckBox("UTF-8 BOM yaz (Excel için)")
+        self.bom_check.setChecked(True)
+        form.addRow("", self.decimal_comma_check)
+        form.addRow("", self.bom_check)
 
-        # Rapor oluştur butonu
-        btn_create = QPushButton("Excel Raporu Oluştur")
-        btn_create.clicked.connect(self.create_report)
-        layout.addWidget(btn_create)
+        layout.addLayout(form)
 
-    def refresh_titles(self):
-        titles = self.database.get_titles()
-        for title in titles:
-            self.title_combo.addItem(title['name'], title['id'])
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+        self.status_label = QLabel()
+        self.status_label.setVisible(False)
+        layout.addWidget(self.status_label)
 
-    def refresh_cash_owners(self):
-        cash_owners = self.database.get_cash_owners()
-        for owner in cash_owners:
-            self.cash_owner_combo.addItem(owner['name'], owner['id'])
+        button_layout = QHBoxLayout()
+        # Rapor oluştur butonu
+        self.btn_create = QPushButton("Excel Raporu Oluştur")
+        self.btn_create.clicked.connect(self.create_report)
+        self.btn_cancel = QPushButton("İptal")
+        self.btn_cancel.clicked.connect(self.cancel_report)
+        self.btn_cancel.setEnabled(False)
+        button_layout.addWidget(self.btn_create)
+        button_layout.addWidget(self.btn_cancel)
+        layout.addLayout(button_layout)
+
+        self.format_combo.currentIndexChanged.connect(self.update_format_options)
+        self.update_format_options()
+
+    def update_format_options(self):
+        _, output_format, button_text = FORMAT_OPTIONS[self.format_combo.currentIndex()]
+        text_output = output_format != 'xlsx'
+        self.split_combo.setEnabled(not text_output)
+        self.decimal_comma_check.setEnabled(text_output)
+        self.bom_check.setEnabled(text_output)
+        self.btn_create.setText(button_text)
 
     def create_report(self):
         filters = {}
-        
+
         if self.title_combo.currentData():
             filters['title_id'] = self.title_combo.currentData()
-        
+
         if self.cash_owner_combo.currentData():
             filters['cash_owner_id'] = self.cash_owner_combo.currentData()
 
-        transactions = self.database.get_transactions(filters)
-        
-        if not transactions:
+        output_format = self.format_combo.currentData()
+        split_by = self.split_combo.currentData() if output_format == 'xlsx' else None
+
+        # Masaüstüne kaydet; bölünmüş raporlar bir klasöre yazılır
+        desktop = Path.home() / "Desktop"
+        self.output_path = new_report_path(desktop, "" if split_by else f".{output_format}")
+
+        def prepare(conn):
+            if split_by:
+                return report_parts(self.database, filters, split_by, conn)
+            return self.database.count_transactions(filters, conn=conn)
+
+        self.set_running(True, "Kayıtlar sayılıyor...")
+        self.query_runner.run(prepare, lambda result: self.start_jobs(filters, split_by, output_format, result))
+
+    def start_jobs(self, filters, split_by, output_format, result):
+        if not result:
+            self.set_running(False)
             QMessageBox.warning(self, "Uyarı", "Seçilen kriterlere uygun kayıt bulunamadı!")
             return
 
-        # Excel dosyası oluştur
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Muhasebe Raporu"
-
-        # Stil tanımlamaları
-        header_font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
-        header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-        header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        
-        # Kenarlık stilleri
-        thin_border = Side(border_style="thin", color="000000")
-        border = Border(left=thin_border, right=thin_border, top=thin_border, bottom=thin_border)
-        
-        # Hücre stilleri
-        number_format = '#,##0.00'
-        cell_alignment = Alignment(horizontal='left', vertical='center')
-        number_alignment = Alignment(horizontal='right', vertical='center')
-        
-        # Başlıkları ekle
-        headers = ["Tarih", "Başlık", "Kasa Sahibi", "Firma", "Açıklama",
-                  "Yapılan Ödeme", "Alınan Ödeme", "Alınan Çek", "Verilen Çek",
-                  "Daire Satış", "Fatura Tutarı", "Miktar", "Birim Fiyat",
-                  "Toplam Tutar"]
-
-        # Sütun genişlikleri
-        column_widths = {
-            'A': 15,  # Tarih
-            'B': 25,  # Başlık
-            'C': 25,  # Kasa Sahibi
-            'D': 25,  # Firma
-            'E': 40,  # Açıklama
-            'F': 15,  # Yapılan Ödeme
-            'G': 15,  # Alınan Ödeme
-            'H': 15,  # Alınan Çek
-            'I': 15,  # Verilen Çek
-            'J': 15,  # Daire Satış
-            'K': 15,  # Fatura Tutarı
-            'L': 12,  # Miktar
-            'M': 15,  # Birim Fiyat
-            'N': 15,  # Toplam Tutar
-        }
-
-        # Sütun genişliklerini ayarla
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-
-        # Başlıkları formatla
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = border
-
-        # Satır yüksekliği
-        ws.row_dimensions[1].height = 30
-
-        # Verileri ekle ve formatla
-        for row, trans in enumerate(transactions, 2):
-            # Tarih ve metin verileri
-            ws.cell(row=row, column=1, value=trans['date']).alignment = cell_alignment
-            ws.cell(row=row, column=2, value=trans['title_name']).alignment = cell_alignment
-            ws.cell(row=row, column=3, value=trans['cash_owner_name']).alignment = cell_alignment
-            ws.cell(row=row, column=4, value=trans['company_name']).alignment = cell_alignment
-            ws.cell(row=row, column=5, value=trans['description']).alignment = cell_alignment
-
-            # Sayısal veriler
-            numeric_cells = [
-                (6, trans['expense']),
-                (7, trans['payment_received']),
-                (8, trans['check_received']),
-                (9, trans['check_given']),
-                (10, trans['apartment_sale']),
-                (11, trans['invoice_amount']),
-                (12, trans['quantity']),
-                (13, trans['unit_price'])
-            ]
-
-            for col, value in numeric_cells:
-                cell = ws.cell(row=row, column=col, value=value or 0)
-                cell.number_format = number_format
-                cell.alignment = number_alignment
-
-            # Toplam Tutar hesaplama ve formatlama
-            total_cell = ws.cell(row=row, column=14)
-            total_cell.value = f"=L{row}*M{row}"
-            total_cell.number_format = number_format
-            total_cell.alignment = number_alignment
-
-            # Tüm hücrelere kenarlık ekle
-            for col in range(1, 15):
-                ws.cell(row=row, column=col).border = border
-
-        # Alternatif satır renklendirmesi
-        for row in range(2, len(transactions) + 2):
-            if row % 2 == 0:
-                for col in range(1, 15):
-                    cell = ws.cell(row=row, column=col)
-                    cell.fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
-
-        # Masaüstüne kaydet
-        desktop_path = str(Path.home() / "Desktop")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        excel_path = f"{desktop_path}/muhasebe_raporu_{timestamp}.xlsx"
-        
-        wb.save(excel_path)
-        QMessageBox.information(self, "Başarılı", f"Rapor başarıyla oluşturuldu:\n{excel_path}") 
\ No newline at end of file
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if split_by:
+            self.output_path.mkdir(exist_ok=True)
+            jobs = [ReportJob(part_filters, self.output_path / file_name, rows)
+                    for (_, part_filters, rows), file_name in zip(result, part_file_names(result))]
+            jobs.append(ReportJob(filters, self.output_path / SUMMARY_FILE_NAME, 0, ["--summary-only"]))
+        elif output_format != 'xlsx':
+            arguments = ["--format", output_format,
+                         "--decimal", "comma" if self.decimal_comma_check.isChecked() else "point"]
+            if not self.bom_check.isChecked():
+                arguments.append("--no-bom")
+            jobs = [ReportJob(filters, self.output_path, result, arguments)]
+        else:
+            jobs = [ReportJob(filters, self.output_path, result)]
+
+        self.set_running(True, f"Rapor yazılıyor ({len(jobs)} dosya)...")
+        self.report_runner.start(jobs)
+
+    def cancel_report(self):
+        self.query_runner.cancel()
+        self.report_runner.cancel()
+        self.remove_empty_output()
+        self.set_running(False)
+
+    def remove_empty_output(self):
+        # İptal edilen veya başarısız bölünmüş raporun boş kalan klasörü
+        if self.output_path is not None and self.output_path.is_dir() and not any(self.output_path.iterdir()):
+            self.output_path.rmdir()
+
+    def set_running(self, running, status=""):
+        self.btn_create.setEnabled(not running)
+        self.btn_cancel.setEnabled(running)
+        self.progress_bar.setVisible(running)
+        self.progress_bar.setRange(0, 0)  # Satır sayısı gelene kadar belirsiz
+        self.status_label.setVisible(running)
+        self.status_label.setText(status)
+
+    def on_progress(self, written, total):
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(written)
+
+    def on_finished(self, count):
+        self.set_running(False)
+        QMessageBox.information(self, "Başarılı",
+                                f"Rapor başarıyla oluşturuldu ({count} işlem):\n{self.output_path}")
+
+    def on_failed(self, message):
+        self.remove_empty_output()
+        self.set_running(False)
+        QMessageBox.critical(self, "Hata", f"Rapor oluşturulamadı:\n{message}")
+
+    def done(self, result):
+        # Pencere kapanırken yarım kalan rapor süreçleri sonlandırılır
+        self.cancel_report()
+        self.query_runner.shutdown()
+        super().done(result)
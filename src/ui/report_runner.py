@@ -0,0 +1,113 @@
+import json
+import sys
+from pathlib import Path
+from PySide6.QtCore import QObject, QProcess, QThread, Signal
+
+# Raporlar komut satırı aracıyla ayrı süreçlerde yazılır
+CLI_PATH = Path(__file__).resolve().parent.parent / "cli.py"
+
+
+class ReportJob:
+    # Tek bir rapor dosyası: filtre, çıktı yolu, beklenen satır sayısı ve ek cli.py argümanları
+    def __init__(self, filters, path, rows, arguments=()):
+        self.filters = filters
+        self.path = Path(path)
+        self.rows = rows
+        self.arguments = list(arguments)
+        self.written = 0
+        self.process = None
+        self.buffer = b""
+        self.done = False
+
+
+class ReportRunner(QObject):
+    # Rapor dosyalarını `cli.py report` süreçleriyle yazar; aynı anda en fazla
+    # işlemci sayısı kadar süreç çalışır. GUI iş parçacığı yalnızca ilerleme
+    # satırlarını okur, cancel() çalışan tüm süreçleri sonlandırır.
+    progress = Signal(int, int)  # yazılan satır, toplam satır
+    finished = Signal(int)  # yazılan toplam satır
+    failed = Signal(str)
+
+    def __init__(self, database, parent=None):
+        super().__init__(parent)
+        self.database = database
+        self.max_processes = max(1, QThread.idealThreadCount())
+        self.jobs = []
+        self.pending = []
+
+    def is_running(self):
+        return any(job.process is not None for job in self.jobs)
+
+    def start(self, jobs):
+        self.cancel()
+        self.jobs = list(jobs)
+        self.pending = list(self.jobs)
+        self.emit_progress()
+        self.start_pending()
+
+    def start_pending(self):
+        running = sum(1 for job in self.jobs if job.process is not None)
+        while self.pending and running < self.max_processes:
+            self.start_job(self.pending.pop(0))
+            running += 1
+
+    def start_job(self, job):
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.SeparateChannels)
+        process.readyReadStandardOutput.connect(lambda: self.read_output(job))
+        process.finished.connect(lambda exit_code, exit_status: self.on_finished(job, exit_code, exit_status))
+        job.process = process
+
+        arguments = [str(CLI_PATH), "--db", str(self.database.db_path.resolve()), "report",
+                     "-o", str(job.path), "--filters", json.dumps(job.filters), "--progress"]
+        process.start(sys.executable, arguments + job.arguments)
+
+    def read_output(self, job):
+        if job.process is None:
+            return
+        job.buffer += bytes(job.process.readAllStandardOutput())
+        *lines, job.buffer = job.buffer.split(b"\n")
+        for line in lines:
+            parts = line.decode("utf-8", "replace").split()
+            if len(parts) == 3 and parts[0] == "ilerleme":
+                job.written = int(parts[1])
+        self.emit_progress()
+
+    def on_finished(self, job, exit_code, exit_status):
+        process, job.process = job.process, None
+        if process is None:
+            return  # İptal edildi
+        process.deleteLater()
+
+        if exit_status != QProcess.NormalExit or exit_code != 0:
+            errors = bytes(process.readAllStandardError()).decode("utf-8", "replace").splitlines()
+            # cli.py hatayı "Hata: ..." satırıyla bildirir; ardından gelen uyarılar gösterilmez
+            messages = [line for line in errors if line.startswith("Hata:")] or errors[-1:]
+            self.cancel()
+            self.failed.emit(messages[0] if messages else f"Rapor süreci başarısız oldu (çıkış kodu {exit_code})")
+            return
+
+        job.done = True
+        job.written = job.rows
+        self.emit_progress()
+        if all(job.done for job in self.jobs):
+            jobs, self.jobs = self.jobs, []
+            self.finished.emit(sum(job.rows for job in jobs))
+        else:
+            self.start_pending()
+
+    def emit_progress(self):
+        self.progress.emit(sum(job.written for job in self.jobs), sum(job.rows for job in self.jobs))
+
+    def cancel(self):
+        # Çalışan süreçler öldürülür; rapor eksik kalacağından bu çalıştırmanın
+        # bitmiş dosyaları da silinir
+        self.pending = []
+        for job in self.jobs:
+            process, job.process = job.process, None
+            if process is not None:
+                process.kill()
+                process.waitForFinished()
+                process.deleteLater()
+            job.path.unlink(missing_ok=True)
+        self.jobs = []
@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QComboBox,
                               QLineEdit, QDateEdit, QPushButton, QDialogButtonBox, QMessageBox)
 from PySide6.QtCore import Qt, QDate
+from .lookup_models import lookup_model
 
 class TransactionDialog(QDialog):
     def __init__(self, database, transaction_id=None):
@@ -8,6 +9,7 @@ class TransactionDialog(QDialog):
         self.database = database
         self.transaction_id = transaction_id
         self.transaction = None
+        self.saved_transaction = None
         if transaction_id:
             self.transaction = database.get_transaction(transaction_id)
         self.setup_ui()
@@ -49,12 +51,12 @@ class TransactionDialog(QDialog):
 
         # Başlık seçimi
         self.title_combo = QComboBox()
-        self.refresh_titles()
+        self.title_combo.setModel(lookup_model(self.database, 'titles'))
         form.addRow("Başlık:", self.title_combo)
 
         # Kasa sahibi seçimi
         self.cash_owner_combo = QComboBox()
-        self.refresh_cash_owners()
+        self.cash_owner_combo.setModel(lookup_model(self.database, 'cash_owners'))
         form.addRow("Kasa Sahibi:", self.cash_owner_combo)
 
         # Diğer alanlar
@@ -110,18 +112,6 @@ class TransactionDialog(QDialog):
         if self.transaction:
             self.load_transaction_data()
 
-    def refresh_titles(self):
-        self.title_combo.clear()
-        titles = self.database.get_titles()
-        for title in titles:
-            self.title_combo.addItem(title['name'], title['id'])
-
-    def refresh_cash_owners(self):
-        self.cash_owner_combo.clear()
-        cash_owners = self.database.get_cash_owners()
-        for owner in cash_owners:
-            self.cash_owner_combo.addItem(owner['name'], owner['id'])
-
     def accept(self):
         try:
             data = {
@@ -173,10 +163,11 @@ class TransactionDialog(QDialog):
                 'unit_price': numeric_fields['Birim Fiyatı']
             })
             
+            # Kaydedilen satır ana pencerede tabloyu yerinde güncellemek için kullanılır
             if self.transaction_id:
-                self.database.update_transaction(self.transaction_id, data)
+                self.saved_transaction = self.database.update_transaction(self.transaction_id, data)
             else:
-                self.database.add_transaction(data)
+                self.saved_transaction = self.database.add_transaction(data)
             
             super().accept()
             
@@ -0,0 +1,295 @@
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# (Başlık, veritabanı alanı, sayısal mı)
+COLUMNS = [
+    ("Tarih", 'date', False),
+    ("Başlık", 'title_name', False),
+    ("Kasa Sahibi", 'cash_owner_name', False),
+    ("İnşaat Grubu", 'construction_group_name', False),
+    ("Firma", 'company_name', False),
+    ("Açıklama", 'description', False),
+    ("Yapılan Ödeme", 'expense', True),
+    ("Alınan Ödeme", 'payment_received', True),
+    ("Alınan Çek", 'check_received', True),
+    ("Verilen Çek", 'check_given', True),
+    ("Daire Satış", 'apartment_sale', True),
+    ("Fatura Tutarı", 'invoice_amount', True),
+    ("Miktar", 'quantity', True),
+    ("Birim Fiyatı", 'unit_price', True),
+    ("Toplam Tutar", 'total_amount', True)
+]
+
+# Ham sıralama değeri (veritabanındaki ORDER BY ile aynı anlamda)
+SORT_ROLE = Qt.UserRole + 1
+
+
+class TransactionTableModel(QAbstractTableModel):
+    # Bir seferde veritabanından okunan satır sayısı
+    PAGE_SIZE = 200
+    # Bellekte tutulan en fazla sayfa sayısı (en son kullanılanlar)
+    MAX_CACHED_PAGES = 10
+    # Tüm sonuç bu kadar satırı aşmıyorsa sıralama bellekte yapılır
+    IN_MEMORY_SORT_LIMIT = PAGE_SIZE
+
+    def __init__(self, database, parent=None, runner=None):
+        super().__init__(parent)
+        self.database = database
+        # Verilirse sayım ve ilk sayfa arka planda okunur (ui.query_worker.QueryRunner)
+        self.runner = runner
+        self.filters = {}
+        self.order_by = ('date', True)
+        self.total_rows = 0
+        self.loaded_rows = 0
+        self.pages = OrderedDict()
+
+    def set_filters(self, filters=None):
+        self.load(dict(filters or {}), self.order_by)
+
+    def load(self, filters, order_by):
+        if self.runner is not None:
+            self.runner.submit(filters, order_by, self.PAGE_SIZE, self.apply_result)
+            return
+
+        total = self.database.count_transactions(filters)
+        rows = self.database.get_transactions(filters, limit=self.PAGE_SIZE, order_by=order_by)
+        self.apply_result(filters, order_by, total, rows)
+
+    def apply_result(self, filters, order_by, total, rows):
+        self.beginResetModel()
+        self.filters = filters
+        self.order_by = order_by
+        self.pages.clear()
+        self.pages[0] = rows
+        self.total_rows = total
+        self.loaded_rows = min(self.total_rows, self.PAGE_SIZE)
+        self.endResetModel()
+
+    # --- Tembel satır yükleme ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.loaded_rows < self.total_rows
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        remaining = self.total_rows - self.loaded_rows
+        count = min(self.PAGE_SIZE, remaining)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, self.loaded_rows + count - 1)
+        self.loaded_rows += count
+        self.endInsertRows()
+
+    def load_page(self, page):
+        if page in self.pages:
+            self.pages.move_to_end(page)
+            return self.pages[page]
+
+        previous = self.pages.get(page - 1)
+        if previous is not None and len(previous) == self.PAGE_SIZE:
+            # İleri kaydırmada önceki sayfanın son satırından devam et (keyset);
+            # süre sayfanın konumundan bağımsızdır
+            rows = self.database.get_transactions_page(
+                self.filters,
+                after=self.database.page_key(previous[-1], self.order_by, self.filters),
+                limit=self.PAGE_SIZE,
+                order_by=self.order_by
+            )
+        else:
+            # Önceki sayfa bellekte değilse (ör. kaydırma çubuğuyla atlama) OFFSET ile oku
+            rows = self.database.get_transactions(
+                self.filters,
+                limit=self.PAGE_SIZE,
+                offset=page * self.PAGE_SIZE,
+                order_by=self.order_by
+            )
+        self.pages[page] = rows
+
+        # Görünür alandan uzaklaşan sayfaları bellekten at
+        while len(self.pages) > self.MAX_CACHED_PAGES:
+            self.pages.popitem(last=False)
+        return rows
+
+    def row_at(self, row):
+        if row < 0 or row >= self.loaded_rows:
+            return None
+        page, offset = divmod(row, self.PAGE_SIZE)
+        rows = self.load_page(page)
+        if offset >= len(rows):
+            return None
+        return rows[offset]
+
+    def transaction_id(self, row):
+        trans = self.row_at(row)
+        return trans['id'] if trans else None
+
+    # --- Yerinde güncelleme (tam yeniden yükleme yapmadan) ---
+
+    def matches(self, trans):
+        # Satır mevcut filtreye uyuyor mu?
+        if 'date_range' in self.filters:
+            start_date, end_date = self.filters['date_range']
+            if not start_date <= trans['date'] <= end_date:
+                return False
+        for key in ('title_id', 'cash_owner_id'):
+            if key in self.filters and trans[key] != self.filters[key]:
+                return False
+        if 'total_range' in self.filters:
+            min_total, max_total = self.filters['total_range']
+            if trans['total_amount'] is None:
+                return False
+            if min_total is not None and trans['total_amount'] < min_total:
+                return False
+            if max_total is not None and trans['total_amount'] > max_total:
+                return False
+        return True
+
+    def position_of(self, trans):
+        return self.database.count_transactions(self.filters, before=(self.order_by, trans))
+
+    def discard_pages_from(self, row):
+        # Satırların kaydığı sayfalar görünür olduklarında yeniden okunur
+        first_page = row // self.PAGE_SIZE
+        for page in [page for page in self.pages if page >= first_page]:
+            del self.pages[page]
+
+    def insert_row(self, row):
+        self.total_rows += 1
+        if row > self.loaded_rows:
+            # Henüz yüklenmemiş bölgeye düşen satır; fetchMore ile gelecek
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.loaded_rows += 1
+        self.discard_pages_from(row)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.total_rows -= 1
+        self.loaded_rows -= 1
+        self.discard_pages_from(row)
+        self.endRemoveRows()
+
+    def add_transaction(self, trans):
+        if self.filters.get('search'):
+            # Arama eşleşmesi ve derecesi veritabanında hesaplanır
+            self.load(self.filters, self.order_by)
+            return
+        if trans is None or not self.matches(trans):
+            return
+        self.insert_row(self.position_of(trans))
+
+    def update_transaction(self, row, trans):
+        if self.filters.get('search'):
+            self.load(self.filters, self.order_by)
+            return
+        if trans is None or not self.matches(trans):
+            self.remove_row(row)
+            return
+
+        new_row = self.position_of(trans)
+        if new_row != row:
+            self.remove_row(row)
+            self.insert_row(new_row)
+            return
+
+        # Sırası değişmedi: önbellekteki satırı değiştir
+        page, offset = divmod(row, self.PAGE_SIZE)
+        if page in self.pages:
+            rows = list(self.pages[page])
+            rows[offset] = trans
+            self.pages[page] = rows
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+
+    # --- Görüntüleme ---
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        _, key, numeric = COLUMNS[index.column()]
+
+        if role == Qt.TextAlignmentRole:
+            if numeric:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+
+        if role not in (Qt.DisplayRole, Qt.UserRole, SORT_ROLE):
+            return None
+
+        trans = self.row_at(index.row())
+        if trans is None:
+            return None
+
+        # İlk sütunda transaction ID'si saklanır
+        if role == Qt.UserRole:
+            return trans['id'] if index.column() == 0 else None
+
+        if role == SORT_ROLE:
+            return self.database.sort_value(trans, (key, False))
+
+        # Sayılar ham değer olarak döner; biçimlendirme çizim sırasında
+        # ui.delegates.AmountDelegate tarafından yerel ayara göre yapılır
+        value = trans[key]
+        if numeric:
+            return float(value or 0)
+        return value or ''
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return section + 1
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Sıralama veritabanında ORDER BY ile yapılır. Sütun seçili değilse
+        # varsayılan sıralama kullanılır (aramada eşleşme derecesi, aksi halde tarih).
+        if column < 0:
+            order_by = None
+        else:
+            order_by = (COLUMNS[column][1], order == Qt.DescendingOrder)
+        if order_by == self.order_by:
+            return
+        if order_by is not None and self.sort_in_memory(order_by):
+            return
+        self.load(self.filters, order_by)
+
+    def sort_in_memory(self, order_by):
+        # Sonucun tamamı ilk sayfadaysa veritabanına gitmeden sırala
+        rows = self.pages.get(0)
+        if rows is None or self.total_rows > self.IN_MEMORY_SORT_LIMIT or len(rows) != self.total_rows:
+            return False
+
+        # ORDER BY ile aynı: artan sırada NULL'lar başta, eşitlikte id aynı yönde
+        def key(trans):
+            value = self.database.sort_value(trans, order_by)
+            return (value is not None, value, trans['id'])
+
+        self.layoutAboutToBeChanged.emit()
+        old_rows = {trans['id']: row for row, trans in enumerate(rows)}
+        rows = sorted(rows, key=key, reverse=order_by[1])
+        new_rows = {trans['id']: row for row, trans in enumerate(rows)}
+        self.pages[0] = rows
+        self.order_by = order_by
+
+        # Seçim ve odak gibi kalıcı indeksler satırlarını izler
+        moved = {old_rows[transaction_id]: new_rows[transaction_id] for transaction_id in old_rows}
+        old_indexes = self.persistentIndexList()
+        new_indexes = [self.index(moved[index.row()], index.column()) for index in old_indexes]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+        return True
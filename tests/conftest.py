@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Uygulama modülleri src/ altında düz olarak içe aktarılır (from database import Database)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,118 @@
+import pytest
+
+from database import Database, ARCHIVE_DIR_NAME
+from test_paging import ORDERS, ledger_records, order_id, page_through, full_read
+
+# Dönem kapanışı işlemleri yıllık arşiv dosyalarına taşır; okuma sorguları ana
+# veritabanı ve arşivleri UNION ALL ile birleştirir. Kapanıştan sonra sonuçlar
+# kapanıştan öncekilerle aynı olmalı, arşiv dosyası sayısı ATTACH sınırını aşmamalıdır.
+FILTERS = [
+    {},
+    {'date_range': ('2007-03-01', '2012-09-30')},
+    {'date_range': ('2021-01-01', '2024-12-31')},
+    {'date_range': ('2016-06-01', '2022-06-30'), 'title_id': 1},
+    {'search': 'beton'},
+]
+
+
+def filters_id(filters):
+    return "+".join(filters) or "filtresiz"
+
+
+def read_all(database):
+    # Kapanıştan bağımsız olması gereken sonuçlar
+    results = {}
+    for index, filters in enumerate(FILTERS):
+        results[index, 'count'] = database.count_transactions(filters)
+        results[index, 'totals'] = tuple(database.get_totals(filters=filters)[0])
+        results[index, 'by_title'] = [tuple(row) for row in database.get_totals('title', filters)]
+        for order_by in ORDERS:
+            results[index, order_by] = full_read(database, filters, order_by)
+    return results
+
+
+@pytest.fixture(scope="module")
+def closed(tmp_path_factory):
+    # 2005-2024 arası 20 yıl; 2019'dan öncesi (14 yıl) kapatılır
+    database = Database(tmp_path_factory.mktemp("arsiv") / "muhasebe.db")
+    database.add_transactions_bulk(ledger_records(600))
+    before = read_all(database)
+    moved = database.close_period(2019)
+    return database, before, moved
+
+
+def test_close_moves_years_and_limits_files(closed):
+    database, before, moved = closed
+    assert moved == database.conn.execute(
+        "SELECT SUM(transaction_count) FROM archives").fetchone()[0]
+    assert database.conn.execute("SELECT MIN(date) FROM transactions").fetchone()[0] >= "2019-01-01"
+    assert [row['year'] for row in database.get_archives()] == list(range(2005, 2019))
+
+    files = database.archive_files(database.conn)
+    assert len(files) <= Database.MAX_ARCHIVE_FILES
+    # Birleştirilen kaynak dosyalar silinir
+    on_disk = sorted(path.name for path in (database.db_path.parent / ARCHIVE_DIR_NAME).glob("*.db"))
+    assert on_disk == sorted(file.split("/")[-1] for file, _ in files)
+    # Son yıllar ayrı dosyalarda kalır
+    assert files[-1][1] == [2018]
+
+
+@pytest.mark.parametrize("index", range(len(FILTERS)), ids=[filters_id(f) for f in FILTERS])
+def test_results_unchanged_after_close(closed, index):
+    database, before, _ = closed
+    after = read_all(database)
+    assert {key: value for key, value in after.items() if key[0] == index} == \
+        {key: value for key, value in before.items() if key[0] == index}
+
+
+@pytest.mark.parametrize("order_by", ORDERS, ids=order_id)
+def test_pages_across_archives(closed, order_by):
+    database, before, _ = closed
+    assert page_through(database, {}, order_by, limit=23) == before[0, order_by]
+
+
+def test_union_arms(closed):
+    database, _, _ = closed
+    conn = database.read_connection()
+    # Yalnızca açık dönem: arşivlere dokunulmaz
+    assert len(database.transaction_arms({'date_range': ('2020-01-01', '2020-12-31')}, conn, "t.id")) == 1
+    # Tek kapanmış yıl: ana veritabanı ve o yılın dosyası
+    assert len(database.transaction_arms({'date_range': ('2018-01-01', '2018-12-31')}, conn, "t.id")) == 2
+    # Tarih filtresi yok: tüm arşiv dosyaları
+    assert len(database.transaction_arms({}, conn, "t.id")) == len(database.archive_files(conn)) + 1
+
+
+def test_archived_rows_are_read_only(closed):
+    database, _, _ = closed
+    archived = database.get_transactions({'date_range': ('2005-01-01', '2005-12-31')}, limit=1)[0]
+    assert database.get_transaction(archived['id']) is None
+
+
+def test_back_dated_record_goes_to_merged_file(tmp_path):
+    database = Database(tmp_path / "muhasebe.db")
+    database.add_transactions_bulk(ledger_records(300))
+    database.close_period(2019)
+    merged = database.conn.execute("SELECT file FROM archives WHERE year = 2005").fetchone()[0]
+    count = database.count_transactions()
+
+    database.add_transactions_bulk([{'date': '2005-07-01', 'title': "Proje 1", 'expense': 5}])
+    assert database.close_period(2019) == 1
+
+    row = database.conn.execute(
+        "SELECT file, transaction_count FROM archives WHERE year = 2005").fetchone()
+    assert row['file'] == merged
+    assert database.count_transactions() == count + 1
+    assert database.count_transactions({'date_range': ('2005-07-01', '2005-07-01')}) >= 1
+    assert len(database.archive_files(database.conn)) <= Database.MAX_ARCHIVE_FILES
+
+
+def test_successive_closes(tmp_path):
+    # Her yıl ayrı ayrı kapatıldığında da dosya sayısı sınırda kalır
+    database = Database(tmp_path / "muhasebe.db")
+    database.add_transactions_bulk(ledger_records(300))
+    expected = full_read(database, {}, ('date', True))
+    for year in range(2006, 2025):
+        database.close_period(year)
+        assert len(database.archive_files(database.conn)) <= Database.MAX_ARCHIVE_FILES
+    assert full_read(database, {}, ('date', True)) == expected
+    assert page_through(database, {}, ('expense', False)) == full_read(database, {}, ('expense', False))
@@ -0,0 +1,41 @@
+import pytest
+
+from database import Database
+from export import write_csv_report, format_precise
+from importer import import_file
+
+# Dışa aktarılan CSV, --decimal verilmeden (otomatik ondalık) geri içe aktarılabilmelidir
+ROWS = [
+    {'quantity': 4, 'unit_price': 2.375, 'expense': 9.5},
+    {'quantity': 0.125, 'unit_price': 1500, 'expense': 1234.56},
+    {'quantity': 12.5, 'unit_price': -0.25, 'expense': 0},
+]
+
+
+def read_rows(database):
+    return [tuple(row) for row in database.conn.execute(
+        "SELECT quantity, unit_price, expense, total_amount FROM transactions ORDER BY quantity")]
+
+
+@pytest.mark.parametrize("delimiter, decimal_comma", [(';', True), (';', False), (',', False)])
+def test_csv_round_trip(tmp_path, delimiter, decimal_comma):
+    source = Database(tmp_path / "kaynak.db")
+    source.add_transactions_bulk([dict(row, date='2024-05-01', title="Proje 1") for row in ROWS])
+    path = tmp_path / "islemler.csv"
+    assert write_csv_report(source, {}, path, delimiter, decimal_comma) == len(ROWS)
+
+    target = Database(tmp_path / "hedef.db")
+    assert import_file(target, path) == len(ROWS)
+
+    assert read_rows(target) == read_rows(source)
+
+
+@pytest.mark.parametrize("value, decimal_comma, expected", [
+    (2.375, False, "2.3750"),
+    (2.375, True, "2,375"),
+    (0.125, False, "0.125"),
+    (1234.567, False, "1234.567"),
+    (4.0, False, "4"),
+])
+def test_format_precise(value, decimal_comma, expected):
+    assert format_precise(value, decimal_comma) == expected
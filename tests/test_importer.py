@@ -0,0 +1,36 @@
+import pytest
+
+from importer import parse_number
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.500", 1500),
+    ("12.345.678", 12345678),
+    ("-1.500", -1500),
+    ("0.125", 0.125),
+    ("-0.250", -0.25),
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("12,5", 12.5),
+    ("2.5", 2.5),
+    ("1 500", 1500),
+    ("", 0),
+])
+def test_parse_number_auto(text, expected):
+    assert parse_number(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text, decimal, expected", [
+    ("1.500", 'point', 1.5),
+    ("1.234,56", 'comma', 1234.56),
+    ("1,234.56", 'point', 1234.56),
+    ("12,5", 'comma', 12.5),
+    ("1.500", 'comma', 1500),
+])
+def test_parse_number_forced_decimal(text, decimal, expected):
+    assert parse_number(text, decimal) == pytest.approx(expected)
+
+
+def test_parse_number_passes_numbers_through():
+    assert parse_number(3) == 3.0
+    assert parse_number(None) == 0
@@ -0,0 +1,62 @@
+from database import Database
+
+# Aynı dosyayı açan iki Database nesnesi, paylaşılan klasördeki iki iş istasyonunu
+# temsil eder: birinin eklediği adlar diğerinin önbelleğinde yokken kayıt yapılabilmelidir
+
+
+def record(**values):
+    data = {
+        'title_id': None, 'cash_owner_id': None, 'date': '2024-05-01',
+        'company_name': 'Demir Ltd.', 'description': '', 'construction_group': '',
+        'expense': 10, 'payment_received': 0, 'check_received': 0, 'check_given': 0,
+        'apartment_sale': 0, 'invoice_amount': 0, 'quantity': 1, 'unit_price': 10,
+    }
+    data.update(values)
+    return data
+
+
+def open_pair(tmp_path):
+    path = tmp_path / "muhasebe.db"
+    first = Database(path)
+    second = Database(path)
+    # Her iki önbellek de diğerinin eklemelerinden önce okunur
+    for database in (first, second):
+        database.get_construction_groups()
+        database.get_titles()
+    return first, second
+
+
+def test_add_transaction_with_group_added_elsewhere(tmp_path):
+    first, second = open_pair(tmp_path)
+    first.add_transaction(record(construction_group='A Blok'))
+
+    saved = second.add_transaction(record(construction_group='A Blok'))
+
+    assert saved['construction_group_name'] == 'A Blok'
+    assert [row['name'] for row in second.get_construction_groups()] == ['A Blok']
+
+
+def test_bulk_insert_with_names_added_elsewhere(tmp_path):
+    first, second = open_pair(tmp_path)
+    first.add_title("Proje 1")
+    first.add_transactions_bulk([{'date': '2024-05-01', 'title': "Proje 1",
+                                  'cash_owner': "Kasa 1", 'construction_group': "B Blok"}])
+
+    assert second.add_transactions_bulk([{'date': '2024-05-02', 'title': "Proje 1",
+                                          'cash_owner': "Kasa 1", 'construction_group': "B Blok"}]) == 1
+
+    rows = second.conn.execute(
+        "SELECT COUNT(DISTINCT title_id), COUNT(DISTINCT cash_owner_id), "
+        "COUNT(DISTINCT construction_group_id) FROM transactions").fetchone()
+    assert tuple(rows) == (1, 1, 1)
+
+
+def test_lookups_reload_after_other_connection_writes(tmp_path):
+    first, second = open_pair(tmp_path)
+    reloaded = []
+    second.add_lookup_listener(reloaded.append)
+
+    first.add_title("Proje 2")
+
+    assert [row['name'] for row in second.get_titles()] == ["Proje 2"]
+    assert 'titles' in reloaded
@@ -0,0 +1,87 @@
+import pytest
+
+from database import Database
+
+# Anahtar kümesiyle (keyset) sayfalama, her sıralama sütununda ve yönde tam sıralı
+# okumayla aynı satırları aynı sırada vermelidir. Veride NULL değerler ve çok sayıda
+# eşit değer bulunur; bunlar build_after_conditions'ın ayrı bölümleridir.
+ORDERS = [(column, descending) for column in Database.SORT_COLUMNS if column != 'rank'
+          for descending in (False, True)]
+
+PAGE_SIZE = 7
+
+
+def order_id(order_by):
+    return f"{order_by[0]}-{'azalan' if order_by[1] else 'artan'}"
+
+
+def maybe(i, step, value):
+    return None if i % step == 0 else value
+
+
+def ledger_records(count, years=range(2005, 2025)):
+    years = list(years)
+    for i in range(count):
+        yield {
+            'date': f"{years[i % len(years)]}-{i % 12 + 1:02d}-{i % 3 + 1:02d}",
+            'title': maybe(i, 11, f"Proje {i % 4}"),
+            'cash_owner': maybe(i, 13, f"Kasa {i % 3}"),
+            'construction_group': maybe(i, 7, f"Blok {i % 2}"),
+            'company_name': maybe(i, 5, "Beton A.Ş." if i % 3 == 0 else "Demir Ltd."),
+            'description': maybe(i, 6, f"hakediş {i % 4}"),
+            'expense': maybe(i, 4, i % 17),
+            'payment_received': i % 2,
+            'check_received': maybe(i, 8, 100),
+            'check_given': 0,
+            'apartment_sale': maybe(i, 3, i % 5 * 1000),
+            'invoice_amount': i % 9,
+            'quantity': maybe(i, 9, i % 6),
+            'unit_price': maybe(i, 10, 2.5),
+        }
+
+
+def page_through(database, filters, order_by, limit=PAGE_SIZE):
+    ids = []
+    after = None
+    while True:
+        rows = database.get_transactions_page(filters, after=after, limit=limit, order_by=order_by)
+        ids.extend(row['id'] for row in rows)
+        if len(rows) < limit:
+            return ids
+        after = database.page_key(rows[-1], order_by, filters)
+
+
+def full_read(database, filters, order_by):
+    return [row['id'] for row in database.get_transactions(filters, order_by=order_by)]
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    database = Database(tmp_path_factory.mktemp("paging") / "muhasebe.db")
+    database.add_transactions_bulk(ledger_records(400))
+    return database
+
+
+@pytest.mark.parametrize("filters", [{}, {'date_range': ('2010-01-01', '2015-06-30')}],
+                         ids=["filtresiz", "tarih"])
+@pytest.mark.parametrize("order_by", ORDERS, ids=order_id)
+def test_pages_match_full_read(database, filters, order_by):
+    expected = full_read(database, filters, order_by)
+    assert len(expected) == database.count_transactions(filters)
+    assert page_through(database, filters, order_by) == expected
+
+
+@pytest.mark.parametrize("order_by", [('rank', False), ('expense', True)], ids=order_id)
+def test_search_pages_match_full_read(database, order_by):
+    filters = {'search': 'beton'}
+    expected = full_read(database, filters, order_by)
+    assert expected
+    assert page_through(database, filters, order_by) == expected
+
+
+@pytest.mark.parametrize("order_by", ORDERS, ids=order_id)
+def test_position_of_row(database, order_by):
+    # Tablo modeli eklenen/düzenlenen satırın yerini count_transactions(before=...) ile bulur
+    rows = database.get_transactions(order_by=order_by)
+    for position in range(0, len(rows), 37):
+        assert database.count_transactions(before=(order_by, rows[position])) == position
@@ -0,0 +1,84 @@
+from itertools import combinations
+
+import pytest
+
+from database import Database
+
+# Filtre alanlarının her birleşimi işlemler tablosunu bir dizinle okumalıdır
+# (EXPLAIN QUERY PLAN'da dizinsiz "SCAN t" olmamalı). Yeni bir filtre veya
+# sorgu değişikliği tam tabloyu taramaya başlarsa bu test başarısız olur.
+FILTERS = {
+    'date_range': ('2024-03-01', '2024-03-31'),
+    'title_id': 1,
+    'cash_owner_id': 2,
+    'total_range': (100, None),
+    'search': 'beton',
+}
+
+FILTER_COMBINATIONS = [dict((key, FILTERS[key]) for key in keys)
+                       for size in range(len(FILTERS) + 1)
+                       for keys in combinations(FILTERS, size)]
+
+
+def combination_id(filters):
+    return "+".join(filters) or "filtresiz"
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    database = Database(tmp_path_factory.mktemp("plan") / "muhasebe.db")
+    title_ids = [database.add_title(f"Proje {i}") for i in range(1, 6)]
+    cash_owner_ids = [database.add_cash_owner(f"Kasa {i}") for i in range(1, 4)]
+    database.add_transactions_bulk({
+        'title_id': title_ids[i % 5],
+        'cash_owner_id': cash_owner_ids[i % 3],
+        'date': f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        'company_name': "Beton A.Ş." if i % 7 == 0 else "Demir Ltd.",
+        'description': "hakediş",
+        'expense': i,
+        'quantity': i % 10,
+        'unit_price': 25,
+    } for i in range(3000))
+    return database
+
+
+def query_plans(database, function):
+    # Çağrının okuma bağlantısında çalıştırdığı sorguların planları
+    conn = database.read_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        function()
+    finally:
+        conn.set_trace_callback(None)
+
+    plans = []
+    for statement in statements:
+        if statement.lstrip().upper().startswith("SELECT"):
+            rows = conn.execute("EXPLAIN QUERY PLAN " + statement).fetchall()
+            plans.append((statement, [row['detail'] for row in rows]))
+    assert plans
+    return plans
+
+
+def assert_uses_index(plans):
+    for statement, details in plans:
+        scans = [detail for detail in details
+                 if detail.split()[:2] == ["SCAN", "t"] and "USING" not in detail]
+        assert not scans, f"Dizinsiz tarama: {scans}\n{statement}\n" + "\n".join(details)
+
+
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS, ids=combination_id)
+def test_transactions_page_uses_index(database, filters):
+    assert_uses_index(query_plans(database, lambda: database.get_transactions(filters, limit=200)))
+
+
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS, ids=combination_id)
+def test_count_uses_index(database, filters):
+    assert_uses_index(query_plans(database, lambda: database.count_transactions(filters)))
+
+
+# Filtresiz genel toplam tüm satırları okumak zorundadır
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS[1:], ids=combination_id)
+def test_totals_use_index(database, filters):
+    assert_uses_index(query_plans(database, lambda: database.get_totals('title', filters)))
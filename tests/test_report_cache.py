@@ -0,0 +1,42 @@
+from database import Database
+from export import write_csv_report
+from report_cache import cached_report
+
+# Rapor önbelleği veritabanı klasöründe tutulur ve klasördeki tüm veritabanlarınca
+# paylaşılır: veri sayacı aynı olan başka bir veritabanının raporu verilmemelidir
+
+
+def make_database(path, expense):
+    database = Database(path)
+    database.add_transactions_bulk([{'date': '2024-05-01', 'title': "Proje 1",
+                                     'company_name': "Demir Ltd.", 'expense': expense}])
+    return database
+
+
+def csv_report(database, path):
+    count = cached_report(database, 'text', {}, path,
+                          lambda output: write_csv_report(database, {}, output), {'delimiter': ';'})
+    assert count == 1
+    return path.read_text(encoding="utf-8-sig")
+
+
+def test_databases_in_same_folder(tmp_path):
+    first = make_database(tmp_path / "a.db", 111)
+    second = make_database(tmp_path / "b.db", 222)
+    assert first.data_revision() == second.data_revision()
+
+    assert "111" in csv_report(first, tmp_path / "a.csv")
+    assert "222" in csv_report(second, tmp_path / "b.csv")
+
+
+def test_recreated_database(tmp_path):
+    first = make_database(tmp_path / "a.db", 111)
+    revision = first.data_revision()
+    assert "111" in csv_report(first, tmp_path / "a.csv")
+    first.connections.close()
+    for path in tmp_path.glob("a.db*"):
+        path.unlink()
+
+    recreated = make_database(tmp_path / "a.db", 333)
+    assert recreated.data_revision() == revision
+    assert "333" in csv_report(recreated, tmp_path / "b.csv")
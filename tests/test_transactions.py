@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from database import Database
+
+# Database.transaction(): en dıştaki blok commit eder, iç bloklar SAVEPOINT ile
+# yalnızca kendi değişikliklerini geri alır; commit edilemeyen işlem açık kalmaz
+
+
+@pytest.fixture
+def database(tmp_path):
+    return Database(tmp_path / "muhasebe.db")
+
+
+def title_names(database):
+    return [row[0] for row in database.conn.execute("SELECT name FROM titles ORDER BY id")]
+
+
+def test_outer_block_commits_once(database):
+    generation = database.write_generation
+    with database.transaction():
+        database.add_title("A")
+        database.add_title("B")
+        assert database.conn.in_transaction
+    assert database.write_generation == generation + 1
+    assert title_names(database) == ["A", "B"]
+    # Okuyucular commit edilmiş veriyi görür
+    assert [row['name'] for row in database.get_titles()] == ["A", "B"]
+
+
+def test_inner_failure_rolls_back_inner_block_only(database):
+    with database.transaction():
+        database.add_title("A")
+        with pytest.raises(sqlite3.IntegrityError):
+            with database.transaction():
+                database.add_title("B")
+                database.add_title("A")
+        database.add_title("C")
+    assert title_names(database) == ["A", "C"]
+    assert database.transaction_depth == 0
+
+
+def test_outer_failure_rolls_back_nested_blocks(database):
+    with pytest.raises(Exception, match="iptal"):
+        with database.transaction():
+            database.add_title("A")
+            with database.transaction():
+                database.add_title("B")
+            raise Exception("iptal")
+    assert title_names(database) == []
+    assert not database.conn.in_transaction
+    # Geri alınan eklemeden sonra ad listesi de yenilenir
+    assert database.get_titles() == []
+
+
+def test_failed_commit_is_rolled_back(database, monkeypatch):
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(database, 'commit', locked)
+    with pytest.raises(sqlite3.OperationalError):
+        database.add_title("A")
+    monkeypatch.undo()
+
+    assert not database.conn.in_transaction
+    assert database.transaction_depth == 0
+    # Sonraki işlem önceki yarım kalan değişiklikleri kaydetmez
+    database.add_title("B")
+    assert title_names(database) == ["B"]
+
+
+def test_begin_write_refuses_open_transaction(database):
+    database.conn.execute("BEGIN")
+    database.conn.execute("INSERT INTO titles (name) VALUES ('yarım')")
+    with pytest.raises(Exception, match="tamamlanmamış"):
+        database.add_title("A")
+    database.conn.rollback()
+    assert title_names(database) == []